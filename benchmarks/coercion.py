@@ -0,0 +1,60 @@
+"""Measure the coercion of request body items per model.
+
+Run from the repository root, no database is needed:
+
+    python -m benchmarks.coercion
+"""
+from os import environ
+from time import perf_counter
+from typing import Any, Dict, List, Tuple
+
+environ.setdefault('DATABASE_URL', 'postgres:postgres@localhost:5432/postgres')
+
+from lib.main import Base  # noqa: E402
+from lib.methods._field_index import FieldIndex  # noqa: E402
+from lib.methods.endpoint import EndPoint  # noqa: E402
+
+#
+SIZE = int(environ.get('BENCHMARK_SIZE', 10000))
+ROUNDS = int(environ.get('BENCHMARK_ROUNDS', 5))
+ITEMS: Tuple[Tuple[str, Dict[str, Any]], ...] = (
+    ('container_tank_person_opening_drops', dict(opening_id=1, volume=0.5)),
+    (
+        'containers',
+        dict(
+            id=1,
+            latitude=50.1,
+            longtitude=30.2,
+            address_id=None,
+            created_at='2020-01-01T00:00:00',
+        ),
+    ),
+    (
+        'users',
+        dict(
+            id='c2af2524-40cc-47e5-84ba-1ef110a120e3',
+            email='user@example.com',
+            email_confirmed_at='2022-01-01T10:00:00+00:00',
+            last_sign_in_at='2022-01-01T10:00:00+00:00',
+        ),
+    ),
+)
+
+
+def main() -> None:
+    FieldIndex.build(Base)
+    EndPoint.build_routes(Base)
+    for route, item in ITEMS:
+        model = EndPoint._routes[route]
+        items: List[Dict[str, Any]] = [dict(item) for _ in range(SIZE)]
+        best = float('inf')
+        for _ in range(ROUNDS):
+            start = perf_counter()
+            for _ in items:
+                EndPoint._coerce_item(None, model, _)
+            best = min(best, perf_counter() - start)
+        print(f'{route}: {SIZE / best:,.0f} items/s')
+
+
+if __name__ == '__main__':
+    main()
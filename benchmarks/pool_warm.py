@@ -0,0 +1,107 @@
+"""Measure the first requests and the connections opened after startup.
+
+Run from the repository root against a database in `DATABASE_URL`:
+
+    python -m benchmarks.pool_warm
+"""
+from asyncio import Queue, create_task, gather, run
+from logging import INFO, disable
+from os import environ
+from statistics import median
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+environ.setdefault('DATABASE_URL', 'postgres:postgres@localhost:5432/postgres')
+environ.setdefault('RESPONSE_CACHE_SIZE', '0')
+
+from sqlalchemy import event  # noqa: E402
+
+from lib.main import app, sqlalchemy  # noqa: E402
+
+# The engine echoes every statement.
+disable(INFO)
+
+#
+ROUTE = environ.get('BENCHMARK_ROUTE', '/locales')
+ROUNDS = int(environ.get('BENCHMARK_ROUNDS', 30))
+
+
+async def start_lifespan() -> Callable[[], Awaitable[None]]:
+    received: Queue = Queue()
+    sent: Queue = Queue()
+    task = create_task(
+        app({'type': 'lifespan'}, received.get, sent.put)  # type: ignore
+    )
+    await received.put({'type': 'lifespan.startup'})
+    print('startup:', (await sent.get())['type'])
+
+    async def stop_lifespan() -> None:
+        await received.put({'type': 'lifespan.shutdown'})
+        print('shutdown:', (await sent.get())['type'])
+        await task
+
+    return stop_lifespan
+
+
+async def request(path: str) -> Tuple[float, int]:
+    scope: Dict[str, Any] = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'https',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 1),
+        'server': ('testserver', 443),
+    }
+    statuses: List[int] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    start = perf_counter()
+    await app(scope, receive, send)  # type: ignore
+    return perf_counter() - start, statuses[0]
+
+
+async def main() -> None:
+    engine = sqlalchemy.session_factory.kw['bind']
+    connects = [0]
+
+    @event.listens_for(engine.sync_engine, 'connect')
+    def count(*_: Any) -> None:
+        connects[0] += 1
+
+    stop_lifespan = await start_lifespan()
+    print('connections during startup:', connects[0])
+    latency, _ = await request(ROUTE)
+    print(f'first request: {latency * 1000:.1f} ms')
+    for concurrency in (1, 8, 32):
+        before, latencies = connects[0], []
+        start = perf_counter()
+        for _ in range(ROUNDS):
+            results = await gather(
+                *(request(ROUTE) for _ in range(concurrency))
+            )
+            assert all(status == 200 for _, status in results), results
+            latencies.extend(latency for latency, _ in results)
+        elapsed = perf_counter() - start
+        print(
+            f'concurrency {concurrency:2d}: '
+            f'{ROUNDS * concurrency / elapsed:7.1f} req/s, '
+            f'median {median(latencies) * 1000:6.2f} ms, '
+            f'new connections {connects[0] - before}'
+        )
+    await stop_lifespan()
+
+
+if __name__ == '__main__':
+    run(main())
@@ -0,0 +1,48 @@
+"""Measure the rendering of model instances into a JSON response body.
+
+Run from the repository root, no database is needed:
+
+    python -m benchmarks.serialization
+"""
+from datetime import datetime, timezone
+from os import environ
+from time import perf_counter
+
+environ.setdefault('DATABASE_URL', 'postgres:postgres@localhost:5432/postgres')
+
+from lib.main import _DefaultORJSONResponse  # noqa: E402
+from lib.models.containers.tanks.operations.openings import (  # noqa: E402
+    container_tank_person_opening_drop_model as drops,
+)
+
+#
+SIZE = int(environ.get('BENCHMARK_SIZE', 50000))
+ROUNDS = int(environ.get('BENCHMARK_ROUNDS', 5))
+
+
+def main() -> None:
+    now = datetime.now(timezone.utc)
+    items = [
+        drops.ContainerTankPersonOpeningDropModel(
+            id=index,
+            opening_id=1,
+            volume=0.25,
+            created_at=now,
+            updated_at=now,
+        )
+        for index in range(SIZE)
+    ]
+    render = _DefaultORJSONResponse.render
+    best = float('inf')
+    for _ in range(ROUNDS):
+        start = perf_counter()
+        body = render(None, items)
+        best = min(best, perf_counter() - start)
+    print(
+        f'{SIZE} rows, {len(body):,} bytes: {best * 1000:.1f} ms, '
+        f'{SIZE / best:,.0f} rows/s'
+    )
+
+
+if __name__ == '__main__':
+    main()
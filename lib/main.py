@@ -26,11 +26,21 @@ from uvicorn import run
 
 from .callbacks.create_visual_schema import create_visual_schema
 from .methods._exception_handlers import sqlalchemy_error_handler
-from .methods.endpoint import endpoint, endpoint_info
+from .methods._field_index import FieldIndex
+from .methods.batch import batch
+from .methods.endpoint import (
+    RESPONSE_CACHE,
+    SPOOL,
+    WRITE_BUFFER,
+    EndPoint,
+    endpoint,
+    endpoint_info,
+)
 from .methods.schema import schema
 from .methods.test_database import test_database
 from .middleware.add_to_scope_middleware import AddToScopeMiddleware
 from .middleware.async_sqlalchemy_middleware import AsyncSQLAlchemyMiddleware
+from .middleware.compression_middleware import CompressionMiddleware
 from .models.base_interface import Base, serialize
 
 
@@ -53,6 +63,7 @@ class _EndpointFilter(Filter):
 basicConfig(level=environ.get('LOGGING', 'INFO'))
 getLogger('uvicorn.access').addFilter(_EndpointFilter())
 schema_path: Final[Path] = Path('./lib/schema.png').resolve()
+pool_size: Final[int] = int(environ.get('DATABASE_POOL_SIZE', 8))
 sqlalchemy: Final = async_scoped_session(
     sessionmaker(
         create_async_engine(
@@ -63,7 +74,7 @@ sqlalchemy: Final = async_scoped_session(
                 'postgres:postgres@localhost:5432/postgres',
             ).split('://')[-1],
             poolclass=AsyncAdaptedQueuePool,
-            pool_size=1,
+            pool_size=pool_size,
             max_overflow=-1,
             pool_recycle=3600,
             pool_pre_ping=True,
@@ -82,14 +93,35 @@ async def _create_visual_schema() -> None:
     return await create_visual_schema(Base.metadata, path=schema_path)
 
 
+async def _build_registries() -> None:
+    FieldIndex.build(Base)
+    EndPoint.build_routes(Base)
+
+
+async def _start_spool() -> None:
+    if SPOOL is not None:
+        await SPOOL.start(
+            sqlalchemy.session_factory.kw['bind'],
+            Base.metadata.tables,
+            on_drain=EndPoint.invalidate,
+        )
+
+
+async def _stop_spool() -> None:
+    if SPOOL is not None:
+        await SPOOL.close()
+
+
 app = FastAPI(
     version='0.0.1',
     docs_url=None,
     default_response_class=_DefaultORJSONResponse,
-    on_startup=(_create_visual_schema,),
+    on_startup=(_build_registries, _create_visual_schema, _start_spool),
+    on_shutdown=(WRITE_BUFFER.close, _stop_spool, RESPONSE_CACHE.close),
     exception_handlers={SQLAlchemyError: sqlalchemy_error_handler},
     dependencies=[OAuth2PasswordBearer(tokenUrl='token')],
     middleware=(
+        Middleware(CompressionMiddleware),
         Middleware(
             AuthlibMiddleware,
             secret_key='d716b68b370baa9bbb73ad5e121a0c21b1a8aa3f9800db61',
@@ -108,7 +140,13 @@ app = FastAPI(
             if 'DATABASE_URL' in environ
             else ()
         ),
-        Middleware(AsyncSQLAlchemyMiddleware, metadata=Base, bind=sqlalchemy),
+        Middleware(
+            AsyncSQLAlchemyMiddleware,
+            metadata=Base,
+            bind=sqlalchemy,
+            warm=int(environ.get('DATABASE_POOL_WARM', pool_size)),
+            retry_interval=float(environ.get('DATABASE_RETRY_INTERVAL', 1)),
+        ),
     ),
     routes=[
         Route('/', schema),
@@ -118,13 +156,14 @@ app = FastAPI(
             lambda request: Response(datetime.now(tzlocal()).isoformat()),
         ),
         Route('/settings/info', endpoint_info),
+        Route('/settings/batch', batch, methods=['POST']),
         *(
             Route(
                 '/'.join(
                     ('/{route}', *('{option%s}' % (i + 1) for i in range(i)))
                 ),
                 endpoint,
-                methods=['GET', 'POST', 'PUT', 'DELETE'],
+                methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'],
             )
             for i in range(4)
         ),
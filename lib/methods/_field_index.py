@@ -0,0 +1,314 @@
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from os import environ
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    Final,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+from urllib.parse import unquote
+from uuid import UUID
+
+from dateutil.parser import isoparse
+from fastapi.exceptions import HTTPException
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.orm.relationships import RelationshipProperty
+from sqlalchemy.sql.schema import Column, Table
+from starlette.status import (
+    HTTP_400_BAD_REQUEST,
+    HTTP_500_INTERNAL_SERVER_ERROR,
+)
+from typing_extensions import Self
+
+from ..models.base_interface import BaseInterface
+
+#
+FIELD_INDEX_DEPTH: Final[int] = int(environ.get('FIELD_INDEX_DEPTH', 2))
+Model = Union[Type[BaseInterface], Table]
+
+
+def _to_bool(value: str, /) -> bool:
+    if value not in {'true', 'false', '1', '0'}:
+        raise ValueError
+    return value in {'true', '1'}
+
+
+def get_python_type(column: Column, /) -> Optional[Type[Any]]:
+    with suppress(NotImplementedError):
+        if getattr(getattr(column.type, 'impl', None), 'python_type', ''):
+            return column.type.impl.python_type
+        elif getattr(column.type, 'python_type', None):
+            return column.type.python_type
+    return None
+
+
+def get_converter(
+    python_type: Optional[Type[Any]],
+    /,
+) -> Optional[Callable[[str], Any]]:
+    if python_type is None or issubclass(python_type, str):
+        return None
+    elif issubclass(python_type, bool):
+        return _to_bool
+    elif issubclass(python_type, (int, float, Decimal)):
+        return python_type
+    elif issubclass(python_type, timedelta):
+        return lambda value: timedelta(seconds=float(value))
+    elif issubclass(python_type, datetime):
+        return isoparse
+    elif issubclass(python_type, date):
+        return lambda value: isoparse(value).date()
+    elif issubclass(python_type, time):
+        return lambda value: isoparse(value).time()
+    return None
+
+
+def _parse_datetime(value: str, /) -> datetime:
+    # The C parser covers the common ISO 8601 forms.
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return isoparse(value)
+
+
+def get_coercer(
+    python_type: Optional[Type[Any]],
+    /,
+) -> Optional[Callable[[Any], Any]]:
+    if python_type is None:
+        return None
+    elif issubclass(python_type, datetime):
+        return lambda value: (
+            value if isinstance(value, datetime) else _parse_datetime(value)
+        )
+    elif issubclass(python_type, date):
+        return lambda value: (
+            value if isinstance(value, date) else _parse_datetime(value).date()
+        )
+    elif issubclass(python_type, time):
+        return lambda value: (
+            value if isinstance(value, time) else _parse_datetime(value).time()
+        )
+    elif issubclass(python_type, timedelta):
+        return lambda value: (
+            timedelta(seconds=value)
+            if isinstance(value, (int, float))
+            else value
+        )
+    elif issubclass(python_type, UUID):
+        return lambda value: (
+            value if isinstance(value, UUID) else UUID(str(value))
+        )
+    return None
+
+
+@dataclass(frozen=True, eq=False)
+class FieldPath(object):
+    chain: Final[Tuple[InstrumentedAttribute, ...]]
+    attribute: Final[Union[Column, InstrumentedAttribute]]
+    field: Final[Union[Column, RelationshipProperty]]
+    python_type: Final[Optional[Type[Any]]]
+    converter: Final[Optional[Callable[[str], Any]]]
+
+    @property
+    def column(self: Self, /) -> Optional[Column]:
+        return self.field if isinstance(self.field, Column) else None
+
+    def convert(self: Self, value: Optional[str], /) -> Optional[Any]:
+        if self.python_type is None:
+            raise HTTPException(
+                HTTP_500_INTERNAL_SERVER_ERROR,
+                f'Could not infer python type for {self.field.key}.',
+            )
+        if value is not None:
+            value = unquote(value.replace('+', ' '))
+        if not value and not issubclass(self.python_type, str):
+            return None
+        elif self.converter is not None:
+            return self.converter(value)
+        return value
+
+
+@dataclass(init=False, frozen=True)
+class FieldIndex(object):
+    model: Final[Model]
+    table: Final[Table]
+    columns: Final[Mapping[str, Column]]
+    relationships: Final[Optional[Mapping[str, RelationshipProperty]]]
+    available: Final[str]
+    required: Final[str]
+    coercions: Final[
+        Tuple[Tuple[str, Optional[Callable[[Any], Any]], bool], ...]
+    ]
+    paths: Final[Mapping[str, FieldPath]]
+
+    _registry: ClassVar[Dict[Model, 'FieldIndex']] = {}
+
+    def __init__(self: Self, model: Model, /) -> None:
+        if not isinstance(table := model, Table):
+            table = model.__table__
+        columns = {_.key: _ for _ in model.columns if _.key}
+        relationships = (
+            {_.key: _ for _ in model.relationships if _.key}
+            if not isinstance(model, Table)
+            else None
+        )
+        object.__setattr__(self, 'model', model)
+        object.__setattr__(self, 'table', table)
+        object.__setattr__(self, 'columns', MappingProxyType(columns))
+        object.__setattr__(
+            self,
+            'relationships',
+            MappingProxyType(relationships)
+            if relationships is not None
+            else None,
+        )
+        object.__setattr__(
+            self,
+            'available',
+            'Available fields: %s.'
+            % ', '.join(f"'{_}'" for _ in (*columns, *(relationships or ()))),
+        )
+        required = [
+            key
+            for key, column in columns.items()
+            if column.default is None
+            and not column.nullable
+            and column.autoincrement is not True
+        ]
+        object.__setattr__(
+            self, 'required', ', '.join(f'`{_}`' for _ in required)
+        )
+        object.__setattr__(
+            self,
+            'coercions',
+            tuple(
+                (key, get_coercer(get_python_type(column)), key in required)
+                for key, column in columns.items()
+                if key not in {'created_at', 'updated_at'}
+            ),
+        )
+        object.__setattr__(self, 'paths', MappingProxyType({}))
+
+    @classmethod
+    def of(
+        cls: Type[Self],
+        model: Model,
+        /,
+        depth: int = FIELD_INDEX_DEPTH,
+    ) -> Self:
+        if (index := cls._registry.get(model)) is None:
+            index = cls._registry[model] = cls(model)
+            object.__setattr__(
+                index, 'paths', MappingProxyType(index._walk(depth))
+            )
+        return index
+
+    @classmethod
+    def build(
+        cls: Type[Self],
+        Base: Any,
+        /,
+        depth: int = FIELD_INDEX_DEPTH,
+    ) -> None:
+        Base.registry.configure()
+        mapped_tables = set()
+        for mapper in Base.registry.mappers:
+            mapped_tables.add(mapper.local_table)
+            cls.of(mapper.class_, depth)
+        for table in Base.metadata.tables.values():
+            if table not in mapped_tables:
+                cls.of(table, depth)
+
+    def _walk(
+        self: Self,
+        depth: int,
+        /,
+        prefix: str = '',
+        chain: Tuple[InstrumentedAttribute, ...] = (),
+    ) -> Dict[str, FieldPath]:
+        paths: Dict[str, FieldPath] = {}
+        for key in self.columns:
+            paths[prefix + key] = self._path(key, chain)
+        for key, relationship in (self.relationships or {}).items():
+            paths[prefix + key] = path = self._path(key, chain)
+            if len(chain) < depth:
+                paths |= self.of(relationship.entity.class_)._walk(
+                    depth, f'{prefix}{key}.', (*path.chain, path.attribute)
+                )
+        return paths
+
+    def _path(
+        self: Self,
+        key: str,
+        chain: Tuple[InstrumentedAttribute, ...],
+        /,
+    ) -> FieldPath:
+        attribute = getattr(
+            self.model.columns
+            if isinstance(self.model, Table)
+            else self.model,
+            key,
+        )
+        field = getattr(
+            getattr(attribute, 'property', attribute), 'expression', attribute
+        )
+        python_type = (
+            get_python_type(field) if isinstance(field, Column) else None
+        )
+        return FieldPath(
+            chain, attribute, field, python_type, get_converter(python_type)
+        )
+
+    def resolve(self: Self, name: str, /) -> FieldPath:
+        if (path := self.paths.get(name.rstrip('.'))) is not None:
+            return path
+        return self._resolve(name)
+
+    def _resolve(
+        self: Self,
+        name: str,
+        /,
+        chain: Tuple[InstrumentedAttribute, ...] = (),
+    ) -> FieldPath:
+        field, *relationship_fields = name.split('.')
+        if field in self.columns:
+            return self._path(field, chain)
+        elif self.relationships is None:
+            raise HTTPException(
+                HTTP_500_INTERNAL_SERVER_ERROR,
+                f"Mapper for table '{self.table.name}' is not present.",
+            )
+        elif (relationship := self.relationships.get(field)) is None:
+            table_or_relationship = 'relationship' if chain else 'table'
+            raise HTTPException(
+                HTTP_400_BAD_REQUEST,
+                f"Field '{field}' is not present in the '%s' "
+                f'{table_or_relationship}. '
+                % '.'.join((self.table.name, *(_.key for _ in chain)))
+                + self.available,
+            )
+
+        path = self._path(field, chain)
+        if not any(relationship_fields):
+            return path
+        try:
+            index = self.of(relationship.entity.class_)
+        except AttributeError as _:
+            raise HTTPException(
+                HTTP_500_INTERNAL_SERVER_ERROR,
+                f'Could not infer type for relationship: {relationship}',
+            ) from _
+        return index._resolve(
+            '.'.join(relationship_fields), (*path.chain, path.attribute)
+        )
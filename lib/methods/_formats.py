@@ -0,0 +1,126 @@
+from contextlib import suppress
+from datetime import date, datetime, time, timedelta
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Final,
+    Iterable,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from uuid import UUID
+
+from orjson import dumps
+from sqlalchemy.sql.sqltypes import (
+    BigInteger,
+    Numeric,
+    SmallInteger,
+    TypeEngine,
+)
+
+from ..models.base_interface import serialize
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+#
+MSGPACK_MEDIA_TYPE: Final[str] = 'application/msgpack'
+ARROW_MEDIA_TYPE: Final[str] = 'application/vnd.apache.arrow.stream'
+ArrowField = Tuple[Any, Optional[Callable[[Any], Any]]]
+_arrow_fields: Final[Dict[TypeEngine, ArrowField]] = {}
+
+
+def is_available(media_type: str, /) -> bool:
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack is not None
+    elif media_type == ARROW_MEDIA_TYPE:
+        return pyarrow is not None
+    return False
+
+
+def render_msgpack(content: Any, /) -> bytes:
+    return msgpack.packb(content, default=_encode_msgpack, datetime=False)
+
+
+def _encode_msgpack(value: Any, /) -> Any:
+    # Aware datetimes use the timestamp extension type of the spec.
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return msgpack.Timestamp.from_datetime(value)
+    return serialize(value)
+
+
+def render_arrow(
+    columns: Iterable[Tuple[str, Optional[TypeEngine], Sequence[Any]]],
+    /,
+) -> bytes:
+    """Return the Arrow IPC stream of the typed `columns` of values."""
+    arrays, fields = [], []
+    for key, type_, values in columns:
+        arrow_type, converter = _get_arrow_field(type_)
+        if converter is not None:
+            values = [_ if _ is None else converter(_) for _ in values]
+        array = pyarrow.array(values, type=arrow_type)
+        arrays.append(array)
+        fields.append(pyarrow.field(key, array.type))
+
+    schema = pyarrow.schema(fields)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(pyarrow.record_batch(arrays, schema=schema))
+    return sink.getvalue().to_pybytes()
+
+
+def _get_arrow_field(type_: Optional[TypeEngine], /) -> ArrowField:
+    if type_ is None:
+        return None, None
+    elif (arrow_field := _arrow_fields.get(type_)) is None:
+        arrow_field = _arrow_fields[type_] = _compile_arrow_field(type_)
+    return arrow_field
+
+
+def _compile_arrow_field(type_: TypeEngine, /) -> ArrowField:
+    python_type = None
+    with suppress(NotImplementedError):
+        python_type = type_.python_type
+    if python_type is None:
+        return None, None
+    elif issubclass(python_type, bool):
+        return pyarrow.bool_(), None
+    elif issubclass(python_type, int):
+        if isinstance(type_, SmallInteger):
+            return pyarrow.int16(), None
+        elif isinstance(type_, BigInteger):
+            return pyarrow.int64(), None
+        return pyarrow.int32(), None
+    elif issubclass(python_type, float):
+        return pyarrow.float64(), None
+    elif isinstance(type_, Numeric) and type_.precision:
+        return pyarrow.decimal128(type_.precision, type_.scale or 0), None
+    elif isinstance(type_, Numeric):
+        return pyarrow.float64(), float
+    elif issubclass(python_type, str):
+        return pyarrow.string(), None
+    elif issubclass(python_type, datetime):
+        timezone = 'UTC' if getattr(type_, 'timezone', False) else None
+        return pyarrow.timestamp('us', tz=timezone), None
+    elif issubclass(python_type, date):
+        return pyarrow.date32(), None
+    elif issubclass(python_type, time):
+        return pyarrow.time64('us'), None
+    elif issubclass(python_type, timedelta):
+        return pyarrow.duration('us'), None
+    elif issubclass(python_type, UUID):
+        if hasattr(pyarrow, 'uuid'):
+            return pyarrow.uuid(), None
+        return pyarrow.string(), str
+    elif issubclass(python_type, (dict, list)):
+        return pyarrow.string(), lambda value: dumps(value).decode()
+    return pyarrow.string(), lambda value: str(serialize(value))
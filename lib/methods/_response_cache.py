@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+from hashlib import blake2b
+from logging import Logger
+from typing import Any, Dict, Final, Hashable, Iterable, Optional, Tuple
+
+from orjson import dumps, loads
+from sqlalchemy.sql.schema import Table
+from starlette.responses import Response
+from typing_extensions import Self
+
+from ..utils.ttl_cache import TTLCache
+
+try:
+    from redis.asyncio import Redis
+    from redis.exceptions import RedisError
+except ImportError:
+    Redis = RedisError = None
+
+#
+Entry = Tuple[Dict[str, str], bytes]
+_SKIPPED_HEADERS: Final[frozenset[str]] = frozenset(
+    ('content-length', 'content-encoding', 'vary')
+)
+
+
+@dataclass(init=False, frozen=True)
+class ResponseCache(object):
+    """The two-tier cache of rendered responses invalidated by tables."""
+
+    max_body_size: Final[int]
+    prefix: Final[str]
+    logger: Final[Logger]
+    local: Final[TTLCache[Hashable, Entry]]
+    shared: Final[Optional[Any]]
+    _versions: Final[Dict[str, int]]
+    _stats: Final[Dict[str, int]]
+
+    def __init__(
+        self: Self,
+        maxsize: int,
+        ttl: float,
+        max_body_size: int,
+        /,
+        url: Optional[str] = None,
+        prefix: str = 'response_cache',
+    ) -> None:
+        object.__setattr__(self, 'max_body_size', max_body_size)
+        object.__setattr__(self, 'prefix', prefix)
+        object.__setattr__(self, 'logger', Logger(self.__class__.__name__))
+        object.__setattr__(self, 'local', TTLCache(maxsize, ttl))
+        shared = None
+        if url and Redis is None:
+            self.logger.warning(
+                'Shared response cache is disabled. '
+                'Redis is not installed or loaded properly.'
+            )
+        elif url:
+            shared = Redis.from_url(url)
+        object.__setattr__(self, 'shared', shared)
+        object.__setattr__(self, '_versions', {})
+        object.__setattr__(self, '_stats', dict(hits=0, misses=0, errors=0))
+
+    async def get(
+        self: Self,
+        key: Hashable,
+        tables: Iterable[Table],
+        /,
+    ) -> Tuple[Optional[Hashable], Optional[Response]]:
+        """Return the versioned key and the response stored for `key`."""
+        if (key := await self._get_key(key, tables)) is None:
+            return None, None
+        elif (entry := self.local.get(key)) is not None:
+            return key, self._to_response(entry)
+        elif self.shared is None:
+            return key, None
+
+        try:
+            value = await self.shared.get(self._get_entry_name(key))
+        except RedisError as exception:
+            self._fail(exception)
+            return None, None
+        if value is None:
+            self._stats['misses'] += 1
+            return key, None
+        self._stats['hits'] += 1
+        headers, _, body = value.partition(b'\n')
+        self.local.set(key, entry := (loads(headers), body), tables)
+        return key, self._to_response(entry)
+
+    async def set(
+        self: Self,
+        key: Hashable,
+        tables: Iterable[Table],
+        response: Response,
+        /,
+    ) -> None:
+        if len(response.body) > self.max_body_size:
+            return
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name not in _SKIPPED_HEADERS
+        }
+        self.local.set(key, (headers, response.body), tables)
+        if self.shared is None:
+            return
+        try:
+            await self.shared.set(
+                self._get_entry_name(key),
+                dumps(headers) + b'\n' + response.body,
+                px=int(self.local.ttl * 1000),
+            )
+        except RedisError as exception:
+            self._fail(exception)
+
+    async def invalidate(self: Self, tables: Iterable[Table], /) -> None:
+        tables = tuple(tables)
+        self.local.invalidate(*tables)
+        for name in map(self._get_version_name, tables):
+            self._versions[name] = self._versions.get(name, 0) + 1
+        if self.shared is None:
+            return
+        try:
+            # Versions make the entries of other processes unreachable.
+            async with self.shared.pipeline(transaction=False) as pipeline:
+                for table in tables:
+                    pipeline.incr(self._get_version_name(table))
+                await pipeline.execute()
+        except RedisError as exception:
+            self._fail(exception)
+
+    async def close(self: Self, /) -> None:
+        if self.shared is not None:
+            await self.shared.close()
+
+    def info(self: Self, /) -> Dict[str, Any]:
+        return dict(
+            self.local.info(),
+            shared=dict(self._stats) if self.shared is not None else None,
+            max_body_size=self.max_body_size,
+        )
+
+    async def _get_key(
+        self: Self,
+        key: Hashable,
+        tables: Iterable[Table],
+        /,
+    ) -> Optional[Hashable]:
+        # The key is taken before the query, so a response rendered across
+        # an invalidation is stored under a version that is not read again.
+        names = sorted(map(self._get_version_name, tables))
+        if self.shared is None:
+            return (key, *(self._versions.get(_, 0) for _ in names))
+        try:
+            versions = await self.shared.mget(names)
+        except RedisError as exception:
+            self._fail(exception)
+            return None
+        return (key, *((_ or b'0').decode() for _ in versions))
+
+    def _fail(self: Self, exception: BaseException, /) -> None:
+        self.logger.warning('Shared response cache failed: %s', exception)
+        self._stats['errors'] += 1
+
+    def _get_entry_name(self: Self, key: Hashable, /) -> str:
+        digest = blake2b(dumps(key), digest_size=16).hexdigest()
+        return f'{self.prefix}:entry:{digest}'
+
+    def _get_version_name(self: Self, table: Table, /) -> str:
+        return f'{self.prefix}:version:{table.fullname}'
+
+    @staticmethod
+    def _to_response(entry: Entry, /) -> Response:
+        headers, body = entry
+        return Response(body, headers=headers)
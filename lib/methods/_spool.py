@@ -0,0 +1,342 @@
+from asyncio import (
+    CancelledError,
+    Task,
+    TimeoutError,
+    create_task,
+    get_running_loop,
+    sleep,
+)
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass
+from logging import Logger
+from os import fsync
+from pathlib import Path
+from time import monotonic
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Final,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from orjson import JSONDecodeError, dumps, loads
+from sqlalchemy.exc import (
+    DBAPIError,
+    InterfaceError,
+    OperationalError,
+    SQLAlchemyError,
+)
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio.engine import AsyncEngine
+from sqlalchemy.sql.expression import insert
+from sqlalchemy.sql.schema import Table
+from typing_extensions import Self
+
+from ..models.base_interface import serialize
+from ._field_index import FieldIndex
+
+
+def is_unavailable(exception: BaseException, /) -> bool:
+    if isinstance(exception, DBAPIError) and exception.connection_invalidated:
+        return True
+    return isinstance(
+        exception,
+        (
+            OSError,
+            TimeoutError,
+            PoolTimeoutError,
+            InterfaceError,
+            OperationalError,
+        ),
+    )
+
+
+async def insert_rows(
+    engine: AsyncEngine,
+    table: Table,
+    rows: List[Dict[str, Any]],
+    /,
+    logger: Logger,
+) -> int:
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(row), []).append(row)
+    try:
+        async with engine.begin() as connection:
+            for group in groups.values():
+                await connection.execute(insert(table), group)
+        return len(rows)
+    except SQLAlchemyError as exception:
+        if is_unavailable(exception):
+            raise
+
+    # A failing row should not discard the rest of the batch.
+    written = 0
+    async with engine.begin() as connection:
+        for row in rows:
+            try:
+                async with connection.begin_nested():
+                    await connection.execute(insert(table), row)
+                written += 1
+            except SQLAlchemyError as exception:
+                if is_unavailable(exception):
+                    raise
+                logger.warning(
+                    'Row of %s was not written: %s', table.name, exception
+                )
+    return written
+
+
+@dataclass(init=False, frozen=True)
+class Spool(object):
+    """The append-only file keeping writes while the database is away."""
+
+    path: Final[Path]
+    batch_size: Final[int]
+    retry_interval: Final[float]
+    logger: Final[Logger]
+    executor: Final[ThreadPoolExecutor]
+    _tables: Final[Dict[str, Table]]
+    _state: Final[Dict[str, Any]]
+    _stats: Final[Dict[str, Any]]
+
+    def __init__(
+        self: Self,
+        path: Path,
+        batch_size: int,
+        retry_interval: float,
+        /,
+    ) -> None:
+        object.__setattr__(self, 'path', path)
+        object.__setattr__(self, 'batch_size', batch_size)
+        object.__setattr__(self, 'retry_interval', retry_interval)
+        object.__setattr__(self, 'logger', Logger(self.__class__.__name__))
+        # A single thread keeps the file operations in order.
+        object.__setattr__(
+            self,
+            'executor',
+            ThreadPoolExecutor(1, thread_name_prefix='spool'),
+        )
+        object.__setattr__(self, '_tables', {})
+        object.__setattr__(
+            self, '_state', dict(engine=None, task=None, on_drain=None)
+        )
+        object.__setattr__(
+            self,
+            '_stats',
+            dict(
+                depth=0,
+                spooled=0,
+                drained=0,
+                failed=0,
+                drain_rate=0.0,
+            ),
+        )
+
+    @property
+    def draining_path(self: Self, /) -> Path:
+        return self.path.with_name(self.path.name + '.draining')
+
+    @property
+    def offset_path(self: Self, /) -> Path:
+        return self.path.with_name(self.path.name + '.offset')
+
+    async def start(
+        self: Self,
+        engine: AsyncEngine,
+        tables: Mapping[str, Table],
+        /,
+        on_drain: Optional[Callable[[Table], Awaitable[None]]] = None,
+    ) -> None:
+        self._tables.update(tables)
+        self._state['engine'] = engine
+        self._state['on_drain'] = on_drain
+        self._stats['depth'] = await self._offload(self._get_depth)
+        if self._stats['depth']:
+            self._wake()
+
+    async def append(
+        self: Self,
+        engine: AsyncEngine,
+        table: Table,
+        rows: List[Dict[str, Any]],
+        /,
+    ) -> None:
+        line = dumps(dict(table=table.name, rows=rows), default=serialize)
+        await self._offload(self._write, line + b'\n')
+        self._tables[table.name] = table
+        self._state['engine'] = engine
+        self._stats['depth'] += len(rows)
+        self._stats['spooled'] += len(rows)
+        self._wake()
+
+    async def close(self: Self, /) -> None:
+        if (task := self._state['task']) is not None and not task.done():
+            task.cancel()
+            with suppress(CancelledError):
+                await task
+
+    def info(self: Self, /) -> Dict[str, Any]:
+        return dict(
+            self._stats,
+            path=str(self.path),
+            batch_size=self.batch_size,
+        )
+
+    def _write(self: Self, line: bytes, /) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open('ab') as file:
+            file.write(line)
+            file.flush()
+            fsync(file.fileno())
+
+    async def _offload(
+        self: Self,
+        function: Callable[..., Any],
+        /,
+        *args: Any,
+    ) -> Any:
+        return await get_running_loop().run_in_executor(
+            self.executor, function, *args
+        )
+
+    def _wake(self: Self, /) -> None:
+        task: Optional[Task] = self._state['task']
+        if task is None or task.done():
+            self._state['task'] = create_task(self._run())
+
+    async def _run(self: Self, /) -> None:
+        while await self._offload(self._exists):
+            try:
+                await self._drain()
+            except Exception as exception:
+                if not is_unavailable(exception):
+                    self.logger.exception('Spool could not be drained.')
+                await sleep(self.retry_interval)
+
+    async def _drain(self: Self, /) -> None:
+        if not await self._offload(self.draining_path.exists):
+            # New writes go to a fresh file while this one is replayed.
+            await self._offload(self._set_offset, 0)
+            await self._offload(self.path.rename, self.draining_path)
+
+        if not (groups := await self._offload(self._read_batch)):
+            await self._offload(self._remove)
+            return
+
+        started = monotonic()
+        size = 0
+        for name, rows, offset in groups:
+            if (table := self._tables.get(name)) is None:
+                self.logger.warning('Spooled table %s is not known.', name)
+                self._stats['failed'] += len(rows)
+            else:
+                written = await insert_rows(
+                    self._state['engine'],
+                    table,
+                    self._coerce(table, rows),
+                    self.logger,
+                )
+                self._stats['drained'] += written
+                self._stats['failed'] += len(rows) - written
+                if written and (on_drain := self._state['on_drain']):
+                    await on_drain(table)
+            # The offset follows every group, so a failure replays only the
+            # groups not written yet. A crash before it is stored repeats
+            # the last group, the writes are replayed at least once.
+            await self._offload(self._set_offset, offset)
+            size += len(rows)
+            self._stats['depth'] = max(self._stats['depth'] - len(rows), 0)
+        self._stats['drain_rate'] = round(
+            size / max(monotonic() - started, 1e-6), 1
+        )
+
+    def _exists(self: Self, /) -> bool:
+        return self.draining_path.exists() or self.path.exists()
+
+    def _get_depth(self: Self, /) -> int:
+        return sum(
+            len(rows)
+            for path, offset in (
+                (self.draining_path, self._get_offset()),
+                (self.path, 0),
+            )
+            for _, rows, _ in self._read(path, offset)
+        )
+
+    def _read_batch(self: Self, /) -> List[Tuple[str, List[Any], int]]:
+        """Return the next lines merged into groups of the same table."""
+        groups: List[Tuple[str, List[Any], int]] = []
+        size = 0
+        for name, rows, offset in self._read(
+            self.draining_path, self._get_offset()
+        ):
+            if groups and groups[-1][0] == name:
+                groups[-1][1].extend(rows)
+                groups[-1] = (name, groups[-1][1], offset)
+            else:
+                groups.append((name, list(rows), offset))
+            if (size := size + len(rows)) >= self.batch_size:
+                break
+        return groups
+
+    def _remove(self: Self, /) -> None:
+        self.draining_path.unlink()
+        self.offset_path.unlink(missing_ok=True)
+
+    def _set_offset(self: Self, offset: int, /) -> None:
+        self.offset_path.write_text(str(offset))
+
+    def _get_offset(self: Self, /) -> int:
+        try:
+            return int(self.offset_path.read_text() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _read(
+        self: Self,
+        path: Path,
+        offset: int,
+        /,
+    ) -> Iterator[Tuple[str, List[Dict[str, Any]], int]]:
+        if not path.exists():
+            return
+        with path.open('rb') as file:
+            file.seek(offset)
+            for line in iter(file.readline, b''):
+                try:
+                    entry = loads(line)
+                    name, rows = entry['table'], entry['rows']
+                except (JSONDecodeError, KeyError, TypeError):
+                    # A torn line is left by a crash in the middle of a write.
+                    self.logger.warning('Spooled line is invalid, skipped.')
+                    continue
+                yield name, rows, file.tell()
+
+    @staticmethod
+    def _coerce(
+        table: Table,
+        rows: List[Dict[str, Any]],
+        /,
+    ) -> List[Dict[str, Any]]:
+        coercions = {
+            key: coercer
+            for key, coercer, _ in FieldIndex.of(table).coercions
+            if coercer is not None
+        }
+        return [
+            {
+                key: coercions[key](value)
+                if key in coercions and value is not None
+                else value
+                for key, value in row.items()
+            }
+            for row in rows
+        ]
@@ -0,0 +1,132 @@
+from asyncio import Event, Task, TimeoutError, create_task, wait_for
+from contextlib import suppress
+from dataclasses import dataclass
+from logging import Logger
+from typing import Any, Awaitable, Callable, Dict, Final, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio.engine import AsyncEngine
+from sqlalchemy.sql.schema import Table
+from typing_extensions import Self
+
+from ._spool import Spool, insert_rows, is_unavailable
+
+
+@dataclass(init=False, frozen=True)
+class WriteBuffer(object):
+    """The in-process buffer coalescing small inserts into bulk ones."""
+
+    max_size: Final[int]
+    flush_size: Final[int]
+    flush_interval: Final[float]
+    spool: Final[Optional[Spool]]
+    logger: Final[Logger]
+    _rows: Final[Dict[Table, List[Dict[str, Any]]]]
+    _targets: Final[
+        Dict[
+            Table, Tuple[AsyncEngine, Optional[Callable[[], Awaitable[None]]]]
+        ]
+    ]
+    _state: Final[Dict[str, Any]]
+    _stats: Final[Dict[str, int]]
+
+    def __init__(
+        self: Self,
+        max_size: int,
+        flush_size: int,
+        flush_interval: float,
+        /,
+        spool: Optional[Spool] = None,
+    ) -> None:
+        object.__setattr__(self, 'max_size', max_size)
+        object.__setattr__(self, 'flush_size', flush_size)
+        object.__setattr__(self, 'flush_interval', flush_interval)
+        object.__setattr__(self, 'spool', spool)
+        object.__setattr__(self, 'logger', Logger(self.__class__.__name__))
+        object.__setattr__(self, '_rows', {})
+        object.__setattr__(self, '_targets', {})
+        object.__setattr__(self, '_state', dict(task=None, wake=None))
+        object.__setattr__(
+            self,
+            '_stats',
+            dict(
+                size=0,
+                accepted=0,
+                rejected=0,
+                written=0,
+                spooled=0,
+                failed=0,
+                flushes=0,
+            ),
+        )
+
+    def append(
+        self: Self,
+        engine: AsyncEngine,
+        table: Table,
+        rows: List[Dict[str, Any]],
+        /,
+        on_flush: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> bool:
+        # Rows that are being flushed still count against the bound.
+        if self._stats['size'] + len(rows) > self.max_size:
+            self._stats['rejected'] += len(rows)
+            return False
+        self._rows.setdefault(table, []).extend(rows)
+        self._targets[table] = (engine, on_flush)
+        self._stats['size'] += len(rows)
+        self._stats['accepted'] += len(rows)
+
+        task: Optional[Task] = self._state['task']
+        if task is None or task.done():
+            self._state['wake'] = Event()
+            self._state['task'] = create_task(self._run())
+        if sum(map(len, self._rows.values())) >= self.flush_size:
+            self._state['wake'].set()
+        return True
+
+    async def flush(self: Self, /) -> None:
+        pending = dict(self._rows)
+        self._rows.clear()
+        for table, rows in pending.items():
+            engine, on_flush = self._targets[table]
+            try:
+                written = await insert_rows(engine, table, rows, self.logger)
+                self._stats['written'] += written
+                self._stats['failed'] += len(rows) - written
+            except Exception as exception:
+                if self.spool is not None and is_unavailable(exception):
+                    await self.spool.append(engine, table, rows)
+                    self._stats['spooled'] += len(rows)
+                else:
+                    self.logger.exception(
+                        'Buffered rows of %s were not written.', table.name
+                    )
+                    self._stats['failed'] += len(rows)
+            finally:
+                self._stats['size'] -= len(rows)
+                if on_flush is not None:
+                    await on_flush()
+        if pending:
+            self._stats['flushes'] += 1
+
+    async def close(self: Self, /) -> None:
+        if (task := self._state['task']) is not None and not task.done():
+            self._state['wake'].set()
+            await task
+        await self.flush()
+
+    def info(self: Self, /) -> Dict[str, Any]:
+        return dict(
+            self._stats,
+            max_size=self.max_size,
+            flush_size=self.flush_size,
+            flush_interval=self.flush_interval,
+        )
+
+    async def _run(self: Self, /) -> None:
+        wake: Event = self._state['wake']
+        while self._rows:
+            with suppress(TimeoutError):
+                await wait_for(wake.wait(), self.flush_interval)
+            wake.clear()
+            await self.flush()
@@ -0,0 +1,131 @@
+from asyncio import Semaphore, gather
+from logging import Logger
+from os import environ
+from typing import Dict, Final
+from urllib.parse import quote, urlsplit
+
+from fastapi.exceptions import HTTPException
+from fastapi.responses import ORJSONResponse
+from orjson import JSONDecodeError, dumps, loads
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio.scoping import async_scoped_session
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.status import (
+    HTTP_400_BAD_REQUEST,
+    HTTP_500_INTERNAL_SERVER_ERROR,
+)
+
+from ._exception_handlers import sqlalchemy_error_handler
+from .endpoint import EndPoint
+
+#
+logger: Final[Logger] = Logger(__file__)
+BATCH_MAX_SIZE: Final[int] = int(environ.get('BATCH_MAX_SIZE', 32))
+BATCH_CONCURRENCY: Final[int] = int(environ.get('BATCH_CONCURRENCY', 4))
+_SKIPPED_HEADERS: Final[frozenset[bytes]] = frozenset(
+    (b'accept', b'content-length', b'content-type', b'prefer')
+)
+
+
+async def batch(request: Request, /) -> Response:
+    if not isinstance(Session := request.get('Session'), async_scoped_session):
+        raise HTTPException(
+            HTTP_500_INTERNAL_SERVER_ERROR, 'Session is not present.'
+        )
+    try:
+        body = loads(await request.body())
+        if isinstance(body, list):
+            body = {_: _ for _ in body}
+        if not isinstance(body, dict) or not all(
+            isinstance(_, str) for _ in body.values()
+        ):
+            raise ValueError
+    except ValueError as _:
+        raise HTTPException(HTTP_400_BAD_REQUEST, 'Body is invalid.') from _
+    if len(body) > BATCH_MAX_SIZE:
+        raise HTTPException(
+            HTTP_400_BAD_REQUEST,
+            f'Batch is limited to {BATCH_MAX_SIZE} requests.',
+        )
+
+    semaphore = Semaphore(BATCH_CONCURRENCY)
+
+    async def run(url: str, /) -> bytes:
+        async with semaphore:
+            try:
+                response = await EndPoint(_get_request(request, url))()
+            except HTTPException as exception:
+                response = ORJSONResponse(
+                    {'detail': exception.detail}, exception.status_code
+                )
+            except SQLAlchemyError as exception:
+                response = await sqlalchemy_error_handler(request, exception)
+            except Exception:
+                # A failing entry must not discard the others.
+                logger.exception('Batch entry %s failed.', url)
+                response = ORJSONResponse(
+                    {'detail': 'Internal Server Error'},
+                    HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+            finally:
+                # Every entry runs in its own task with its own session.
+                await Session.remove()
+        return _render_entry(response)
+
+    entries = await gather(*(run(url) for url in body.values()))
+    return Response(
+        b'{%s}'
+        % b','.join(
+            b'%s:%s' % (dumps(key), entry) for key, entry in zip(body, entries)
+        ),
+        media_type='application/json',
+    )
+
+
+def _get_request(request: Request, url: str, /) -> Request:
+    url = urlsplit(url)
+    route, *options = url.path.strip('/').split('/')
+    if len(options) > 3:
+        raise HTTPException(HTTP_400_BAD_REQUEST, 'Route is not determined.')
+    path_params: Dict[str, str] = dict(route=route)
+    for index, option in enumerate(options):
+        path_params[f'option{index + 1}'] = option
+    return Request(
+        {
+            **request.scope,
+            'method': 'GET',
+            'path': url.path,
+            'raw_path': url.path.encode(),
+            'query_string': quote(url.query, safe='=&|<>!@.,:+%').encode(),
+            'path_params': path_params,
+            'headers': [
+                *(
+                    (key, value)
+                    for key, value in request.scope['headers']
+                    if key not in _SKIPPED_HEADERS
+                ),
+                (b'accept', b'application/json'),
+            ],
+        }
+    )
+
+
+def _render_entry(response: Response, /) -> bytes:
+    body = response.body
+    if response.media_type != 'application/json':
+        try:
+            loads(body)
+        except JSONDecodeError:
+            body = dumps(body.decode())
+    return b'{"status":%d,"headers":%s,"body":%s}' % (
+        response.status_code,
+        dumps(
+            {
+                key: value
+                for key, value in response.headers.items()
+                if key.startswith('x-') or key == 'link'
+            }
+        ),
+        body or b'null',
+    )
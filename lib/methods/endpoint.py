@@ -1,19 +1,28 @@
 from ast import operator
-from contextlib import suppress
+from asyncio import sleep, wait_for
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from contextlib import nullcontext
+from csv import reader
 from dataclasses import dataclass
-from datetime import date, datetime, time, timedelta
-from decimal import Decimal
-from inspect import isclass
+from datetime import date, time, timedelta
+from functools import lru_cache, partial
+from hashlib import blake2b
+from itertools import repeat
 from operator import eq, ge, gt, le, lt, ne
+from os import environ
+from pathlib import Path
 from types import MappingProxyType
 from typing import (
     TYPE_CHECKING,
     Any,
+    AsyncIterator,
     ClassVar,
     Dict,
     Final,
+    FrozenSet,
     Iterable,
     List,
+    Mapping,
     Optional,
     Tuple,
     Type,
@@ -21,41 +30,158 @@ from typing import (
 )
 from urllib.parse import unquote
 
-from dateutil.parser import isoparse
 from fastapi.applications import FastAPI
 from fastapi.exceptions import HTTPException
 from fastapi.responses import ORJSONResponse
-from orjson import loads
+from orjson import dumps, loads
+from sqlalchemy.dialects.postgresql import (
+    JSON,
+    JSONB,
+    Insert,
+    aggregate_order_by,
+    insert,
+)
 from sqlalchemy.ext.asyncio.engine import AsyncEngine
 from sqlalchemy.ext.asyncio.scoping import async_scoped_session
-from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import aliased, load_only, selectinload
 from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.orm.interfaces import MANYTOONE, ONETOMANY
 from sqlalchemy.orm.relationships import RelationshipProperty
-from sqlalchemy.sql.expression import and_, delete, or_, select
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.dml import Update
+from sqlalchemy.sql.elements import ClauseElement
+from sqlalchemy.sql.expression import (
+    and_,
+    bindparam,
+    cast,
+    delete,
+    literal_column,
+    or_,
+    select,
+    text,
+    tuple_,
+    update,
+)
 from sqlalchemy.sql.functions import count as sa_count
 from sqlalchemy.sql.functions import func
+from sqlalchemy.sql.operators import desc_op
 from sqlalchemy.sql.schema import Column, ColumnClause, MetaData, Table
+from sqlalchemy.sql.selectable import FromClause, Select
+from sqlalchemy.sql.sqltypes import Integer, Interval, Text, TypeEngine
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.responses import Response, StreamingResponse
 from starlette.status import (
+    HTTP_200_OK,
+    HTTP_201_CREATED,
+    HTTP_202_ACCEPTED,
     HTTP_204_NO_CONTENT,
     HTTP_304_NOT_MODIFIED,
     HTTP_400_BAD_REQUEST,
+    HTTP_406_NOT_ACCEPTABLE,
     HTTP_500_INTERNAL_SERVER_ERROR,
+    HTTP_503_SERVICE_UNAVAILABLE,
 )
 from typing_extensions import Self
 
-from ..models.base_interface import BaseInterface
+from ..models.base_interface import (
+    BaseInterface,
+    serialize,
+    serialize_columnar,
+)
+from ..utils.ttl_cache import TTLCache
+from ._field_index import FieldIndex, FieldPath
+from ._formats import (
+    ARROW_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    is_available,
+    render_arrow,
+    render_msgpack,
+)
+from ._response_cache import ResponseCache
+from ._spool import Spool, is_unavailable
+from ._write_buffer import WriteBuffer
+
+#
+STATEMENT_CACHE_SIZE: Final[int] = int(
+    environ.get('STATEMENT_CACHE_SIZE', 256)
+)
+ROUTE_INFLECT: Final[bool] = environ.get('ROUTE_INFLECT', '').lower() in {
+    '1',
+    'true',
+}
+STREAM_CHUNK_SIZE: Final[int] = int(environ.get('STREAM_CHUNK_SIZE', 1000))
+NDJSON_MEDIA_TYPE: Final[str] = 'application/x-ndjson'
+CSV_MEDIA_TYPE: Final[str] = 'text/csv'
+COLUMNAR_MEDIA_TYPE: Final[str] = 'application/vnd.columnar+json'
+INGEST_CHUNK_SIZE: Final[int] = int(environ.get('INGEST_CHUNK_SIZE', 5000))
+BULK_COPY_THRESHOLD: Final[int] = int(environ.get('BULK_COPY_THRESHOLD', 1000))
+DELETE_CHUNK_SIZE: Final[int] = int(environ.get('DELETE_CHUNK_SIZE', 5000))
+DELETE_CHUNK_PAUSE: Final[float] = float(environ.get('DELETE_CHUNK_PAUSE', 0))
+DELETE_GUARD_THRESHOLD: Final[int] = int(
+    environ.get('DELETE_GUARD_THRESHOLD', 10000)
+)
+COUNT_CACHE: Final[TTLCache[Tuple[Any, ...], int]] = TTLCache(
+    int(environ.get('COUNT_CACHE_SIZE', 1024)),
+    float(environ.get('COUNT_CACHE_TTL', 30)),
+)
+ETAG_CACHE: Final[TTLCache[str, str]] = TTLCache(
+    int(environ.get('ETAG_CACHE_SIZE', 4096)),
+    float(environ.get('ETAG_CACHE_TTL', 300)),
+)
+WRITE_BUFFER_TABLES: Final[FrozenSet[str]] = frozenset(
+    _
+    for _ in environ.get(
+        'WRITE_BUFFER_TABLES',
+        'container_tank_person_opening_drops,'
+        'container_tank_company_opening_drops',
+    ).split(',')
+    if _
+)
+SPOOL_TABLES: Final[FrozenSet[str]] = (
+    frozenset(_ for _ in environ['SPOOL_TABLES'].split(',') if _)
+    if 'SPOOL_TABLES' in environ
+    else WRITE_BUFFER_TABLES
+)
+SPOOL_CONNECT_TIMEOUT: Final[float] = float(
+    environ.get('SPOOL_CONNECT_TIMEOUT', 1)
+)
+SPOOL: Final[Optional[Spool]] = (
+    Spool(
+        Path(environ['SPOOL_PATH']),
+        int(environ.get('SPOOL_BATCH_SIZE', 5000)),
+        float(environ.get('SPOOL_RETRY_INTERVAL', 5)),
+    )
+    if environ.get('SPOOL_PATH')
+    else None
+)
+RESPONSE_CACHE: Final[ResponseCache] = ResponseCache(
+    int(environ.get('RESPONSE_CACHE_SIZE', 512)),
+    float(environ.get('RESPONSE_CACHE_TTL', 60)),
+    int(environ.get('RESPONSE_CACHE_MAX_BODY_SIZE', 1 << 16)),
+    environ.get('RESPONSE_CACHE_URL'),
+)
+WRITE_BUFFER: Final[WriteBuffer] = WriteBuffer(
+    int(environ.get('WRITE_BUFFER_MAX_SIZE', 10000)),
+    int(environ.get('WRITE_BUFFER_FLUSH_SIZE', 1000)),
+    float(environ.get('WRITE_BUFFER_FLUSH_INTERVAL', 0.2)),
+    SPOOL,
+)
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache: Final[bool] = False
 
+    def __init__(self: Self, statement: Select, /) -> None:
+        self.statement = statement
 
-def _get_keys(
-    model: Union[Type[BaseInterface], Table],
-) -> tuple[dict[str, Column], Optional[dict[str, RelationshipProperty]]]:
-    return (
-        {_.key: _ for _ in model.columns if _.key},
-        {_.key: _ for _ in model.relationships if _.key}
-        if isclass(model) and issubclass(model, BaseInterface)
-        else None,
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler: Any, /, **kwargs) -> str:
+    return 'EXPLAIN (FORMAT JSON) ' + compiler.process(
+        element.statement, **kwargs
     )
 
 
@@ -67,6 +193,17 @@ async def endpoint_info(request: Request, /) -> Response:
     return await EndPoint(request).info()
 
 
+@dataclass(frozen=True, eq=False)
+class Graph(object):
+    tables: Final[Tuple[Table, ...]]
+    rows: Final[Tuple[Dict[str, Any], ...]]
+    dependencies: Final[
+        Tuple[Tuple[Tuple[int, Tuple[Tuple[str, str], ...]], ...], ...]
+    ]
+    levels: Final[Tuple[Tuple[int, ...], ...]]
+    roots: Final[Tuple[int, ...]]
+
+
 @dataclass(init=False, frozen=True)
 class EndPoint(object):
 
@@ -81,7 +218,9 @@ class EndPoint(object):
 
         Base: Final[Type[_DeclarativeBase]]
 
-    _tables_registry: ClassVar[Dict[str, Union[Table, BaseInterface]]] = {}
+    _routes: ClassVar[
+        Mapping[str, Union[Table, Type[BaseInterface]]]
+    ] = MappingProxyType({})
 
     def __init__(self: Self, request: Request, /) -> None:
         if not isinstance(app := request.get('app'), FastAPI):
@@ -102,10 +241,6 @@ class EndPoint(object):
             raise HTTPException(
                 HTTP_500_INTERNAL_SERVER_ERROR, 'MetaData is not present.'
             )
-        if not isinstance(route := request.path_params.get('route'), str):
-            raise HTTPException(
-                HTTP_500_INTERNAL_SERVER_ERROR, 'Route is not present.'
-            )
         object.__setattr__(self, 'request', request)
         object.__setattr__(self, 'app', app)
         object.__setattr__(self, 'engine', engine)
@@ -114,7 +249,27 @@ class EndPoint(object):
         object.__setattr__(self, 'Base', request.get('Base'))
 
     async def info(self: Self, /) -> Response:
-        return Response(str(self.engine.url))
+        if not self._routes:
+            self.build_routes(
+                self.metadata if self.Base is None else self.Base
+            )
+        return self._get_response_class()(
+            dict(
+                url=self.engine.url.render_as_string(hide_password=True),
+                routes={
+                    route: FieldIndex.of(model).table.fullname
+                    for route, model in self._routes.items()
+                },
+                statement_cache=(
+                    EndPointStatementBuilder._select.cache_info()._asdict()
+                ),
+                count_cache=COUNT_CACHE.info(),
+                etag_cache=ETAG_CACHE.info(),
+                response_cache=RESPONSE_CACHE.info(),
+                write_buffer=WRITE_BUFFER.info(),
+                spool=SPOOL.info() if SPOOL is not None else None,
+            )
+        )
 
     async def __call__(self: Self, /) -> Response:
         route: Final[str] = self.request.path_params.get('route', '').lower()
@@ -124,29 +279,78 @@ class EndPoint(object):
             )
 
         if self.request.method == 'DELETE':
-            async with self.Session.begin():
-                statement = (
-                    EndPointStatementBuilder.delete(model, query)
-                    if (query := self.request.url.query)
-                    else delete(model)
+            return await self._delete(model)
+
+        elif self.request.method in {'POST', 'PUT', 'PATCH'}:
+            content_type = self.request.headers.get('content-type', '')
+            if self.request.method != 'PATCH' and (
+                content_type := content_type.split(';')[0].strip().lower()
+            ) in {NDJSON_MEDIA_TYPE, CSV_MEDIA_TYPE}:
+                return await self._ingest(
+                    model, csv=content_type == CSV_MEDIA_TYPE
                 )
-                await self.Session.execute(statement)
-            return Response(None, HTTP_204_NO_CONTENT)
 
-        elif self.request.method in {'POST', 'PUT'}:
             try:
                 body = loads(await self.request.body())
                 if not isinstance(body, Iterable):
                     raise ValueError
                 elif isinstance(body, list) and not body:
-                    raise HTTPException(
-                        HTTP_304_NOT_MODIFIED, 'Body is empty.'
-                    )
+                    return Response(None, HTTP_204_NO_CONTENT)
             except ValueError as _:
                 raise HTTPException(
                     HTTP_400_BAD_REQUEST, 'Body is invalid.'
                 ) from _
 
+            if self.request.method == 'PATCH' or (
+                self.request.method == 'PUT'
+                and self.request.url.query
+                and isinstance(body, dict)
+            ):
+                return await self._update(model, body)
+
+            elif (
+                self.request.method == 'POST'
+                and 'respond-async' in self._get_preferences()
+                and FieldIndex.of(model).table.name in WRITE_BUFFER_TABLES
+            ):
+                return self._buffer(model, body)
+
+            elif rows := self._get_rows(
+                model, [body] if isinstance(body, dict) else list(body)
+            ):
+                returning = self._get_preferences().get('return') == 'keys'
+                if (
+                    SPOOL is not None
+                    and not returning
+                    and self.request.method == 'POST'
+                    and FieldIndex.of(model).table.name in SPOOL_TABLES
+                ):
+                    return await self._spool(model, rows)
+                async with self.Session.begin():
+                    keys = await self._insert(
+                        model,
+                        rows,
+                        returning=returning,
+                        upsert=self.request.method == 'PUT',
+                    )
+                await self.invalidate(model)
+                if returning:
+                    return self._get_response_class()(keys, HTTP_201_CREATED)
+                return Response(None, HTTP_204_NO_CONTENT)
+
+            elif self.request.method == 'POST' and (
+                graph := self._plan_graph(
+                    model, [body] if isinstance(body, dict) else list(body)
+                )
+            ):
+                returning = self._get_preferences().get('return') == 'keys'
+                async with self.Session.begin():
+                    keys = await self._insert_graph(graph)
+                await self.invalidate(model)
+                if returning:
+                    return self._get_response_class()(keys, HTTP_201_CREATED)
+                return Response(None, HTTP_204_NO_CONTENT)
+
             items = []
             if isinstance(body, dict):
                 items.append(self._modify_item(model, body))
@@ -159,12 +363,14 @@ class EndPoint(object):
                 else:
                     for item in items:
                         await self.Session.merge(item)
+            await self.invalidate(model)
             return Response(None, HTTP_204_NO_CONTENT)
 
         else:
             limit: int = 0
             offset: int = 0
             count: bool = False
+            cursor: Optional[str] = None
             option1: str = self.request.path_params.get('option1', None)
             if option1 is not None:
                 if option1.isdecimal():
@@ -182,73 +388,1259 @@ class EndPoint(object):
                         offset = int(option2)
                     elif option2.lower() == 'count':
                         count = True
+                    elif option2.lower() == 'cursor':
+                        # The token of the next page follows the keyword.
+                        cursor = self.request.path_params.get('option3', '')
                     elif option2:
                         raise HTTPException(
                             HTTP_400_BAD_REQUEST, 'Offset is invalid.'
                         )
 
                     option3: str = self.request.path_params.get('option3', '')
-                    if option3.lower() == 'count':
+                    if cursor is None and option3.lower() == 'count':
                         count = True
 
-            statement, is_raw = (
-                EndPointStatementBuilder.select(
-                    model, query, limit=limit, offset=offset, count=count
+            if cursor is not None and (count or not limit):
+                raise HTTPException(
+                    HTTP_400_BAD_REQUEST,
+                    'Cursor pagination requires a limit and cannot be '
+                    'counted.',
+                )
+            preferences = self._get_preferences()
+            media_type = self._get_media_type()
+            stream = (
+                cursor is None
+                and media_type is None
+                and (
+                    self._accepts(NDJSON_MEDIA_TYPE) or 'stream' in preferences
                 )
-                if (query := self.request.url.query)
-                else (select(model), isinstance(model, Table))
+            )
+            render = (
+                not stream
+                and media_type is None
+                and cursor is None
+                and preferences.get('render') == 'database'
+            )
+            statement, params, is_raw, keys = EndPointStatementBuilder.select(
+                model,
+                self.request.url.query,
+                limit=limit,
+                offset=offset,
+                count=count,
+                cursor=cursor,
+                render=render,
             )
             if count:
-                return Response(str(await self.Session.scalar(statement) or 0))
+                return await self._count(
+                    model, statement, params, limit=limit, offset=offset
+                )
+
+            tables = EndPointStatementBuilder.tables(
+                model, self.request.url.query
+            )
+            key, response = (
+                await RESPONSE_CACHE.get(
+                    (
+                        self.request.url.path,
+                        unquote(self.request.url.query.replace('+', ' ')),
+                        media_type,
+                        render,
+                    ),
+                    tables,
+                )
+                if not stream
+                else (None, None)
+            )
+            if response is not None:
+                if self._is_fresh(etag := response.headers.get('etag', '')):
+                    return self._not_modified(etag)
+                response.headers['X-Cache'] = 'hit'
+                return response
+
+            # Conditional requests of a page are answered from the tag of
+            # the body last rendered for the same rows, if it is known.
+            validator = (
+                await self._get_validator(
+                    model, limit=limit, offset=offset, cursor=cursor
+                )
+                if limit
+                and not stream
+                and 'if-none-match' in self.request.headers
+                else None
+            )
+            if (
+                validator is not None
+                and (etag := ETAG_CACHE.get(validator)) is not None
+                and self._is_fresh(etag)
+            ):
+                return self._not_modified(etag)
+            response = await self._get(
+                model,
+                statement,
+                params,
+                is_raw,
+                keys,
+                media_type=media_type,
+                stream=stream,
+                render=render,
+                limit=limit,
+            )
+            if not isinstance(response, StreamingResponse):
+                etag = (
+                    '"%s"' % blake2b(response.body, digest_size=16).hexdigest()
+                )
+                if (
+                    validator is not None
+                    and response.status_code == HTTP_200_OK
+                ):
+                    ETAG_CACHE.set(validator, etag)
+                if self._is_fresh(etag):
+                    return self._not_modified(etag)
+                response.headers['ETag'] = etag
+            if key is not None and response.status_code == HTTP_200_OK:
+                await RESPONSE_CACHE.set(key, tables, response)
+                response.headers['X-Cache'] = 'miss'
+            return response
+
+    async def _get(
+        self: Self,
+        model: Union[Type[BaseInterface], Table],
+        statement: Select,
+        params: Dict[str, Any],
+        is_raw: bool,
+        keys: Tuple[Tuple[FieldPath, bool], ...],
+        /,
+        *,
+        media_type: Optional[str],
+        stream: bool,
+        render: bool,
+        limit: int,
+    ) -> Response:
+        if stream:
+            return await self._stream(
+                statement,
+                params,
+                is_raw,
+                ndjson=self._accepts(NDJSON_MEDIA_TYPE),
+            )
+
+        elif render and not is_raw:
+            return Response(
+                await self.Session.scalar(statement, params),
+                media_type='application/json',
+            )
+
+        try:
+            response = self._get_response_class()
+            if is_raw:
+                types = [_['type'] for _ in statement.column_descriptions]
+                if media_type == ARROW_MEDIA_TYPE and not all(
+                    isinstance(_, TypeEngine) for _ in types
+                ):
+                    raise HTTPException(
+                        HTTP_406_NOT_ACCEPTABLE,
+                        f'Media type `{media_type}` cannot hold related '
+                        'objects selected next to columns.',
+                    )
+                result = await self.Session.execute(statement, params)
+                rows = list(map(list, result.all()))
+                if media_type == COLUMNAR_MEDIA_TYPE:
+                    return response(
+                        dict(columns=list(result.keys()), rows=rows),
+                        media_type=media_type,
+                    )
+                elif media_type == MSGPACK_MEDIA_TYPE:
+                    return Response(
+                        render_msgpack(rows), media_type=media_type
+                    )
+                elif media_type == ARROW_MEDIA_TYPE:
+                    return Response(
+                        render_arrow(
+                            zip(
+                                result.keys(),
+                                types,
+                                zip(*rows) if rows else repeat(()),
+                            )
+                        ),
+                        media_type=media_type,
+                    )
+                return response(rows)
+            items = (await self.Session.scalars(statement, params)).all()
+            if media_type == COLUMNAR_MEDIA_TYPE:
+                response = response(
+                    serialize_columnar(items), media_type=media_type
+                )
+            elif media_type == MSGPACK_MEDIA_TYPE:
+                response = Response(
+                    render_msgpack(items), media_type=media_type
+                )
+            elif media_type == ARROW_MEDIA_TYPE:
+                # Loaded relationships are left out of the flat table.
+                response = Response(
+                    render_arrow(
+                        (
+                            column.key,
+                            column.type,
+                            [_.__dict__.get(column.key) for _ in items],
+                        )
+                        for column in model.columns
+                        if not items or column.key in items[0].__dict__
+                    ),
+                    media_type=media_type,
+                )
+            else:
+                response = response(items)
+            if keys and len(items) == limit:
+                token = EndPointStatementBuilder.encode_cursor(keys, items[-1])
+                response.headers['X-Next-Cursor'] = token
+                response.headers['Link'] = '<%s>; rel="next"' % (
+                    self.request.url.replace(
+                        path='/%s/%s/cursor/%s'
+                        % (self.request.path_params['route'], limit, token)
+                    )
+                )
+            return response
+        except TypeError as _:
+            raise HTTPException(
+                HTTP_500_INTERNAL_SERVER_ERROR,
+                'Request was valid, but response could not be processed '
+                'correctly.',
+            ) from _
+
+    async def _get_validator(
+        self: Self,
+        model: Union[Type[BaseInterface], Table],
+        /,
+        *,
+        limit: int,
+        offset: int,
+        cursor: Optional[str],
+    ) -> Optional[str]:
+        query = self.request.url.query
+        validator = EndPointStatementBuilder.validator(
+            model, query, limit=limit, offset=offset, cursor=cursor
+        )
+        if validator is None:
+            return None
+        aggregates = (await self.Session.execute(*validator)).one()
+        return blake2b(
+            dumps(
+                (
+                    self.request.url.path,
+                    query,
+                    self.request.headers.get('accept', ''),
+                    self.request.headers.getlist('prefer'),
+                    *aggregates,
+                )
+            ),
+            digest_size=16,
+        ).hexdigest()
+
+    def _is_fresh(self: Self, etag: str, /) -> bool:
+        if (
+            not etag
+            or (header := self.request.headers.get('if-none-match')) is None
+        ):
+            return False
+        # The comparison is weak, as compression weakens the tags.
+        etags = {_.strip().removeprefix('W/') for _ in header.split(',')}
+        return '*' in etags or etag.removeprefix('W/') in etags
+
+    async def _count(
+        self: Self,
+        model: Union[Type[BaseInterface], Table],
+        statement: Select,
+        params: Dict[str, Any],
+        /,
+        *,
+        limit: int,
+        offset: int,
+    ) -> Response:
+        query = self.request.url.query
+        if self._get_preferences().get('count') in {'planned', 'estimated'}:
+            kind = 'estimated'
+            value = await self._estimate(
+                model, query, limit=limit, offset=offset
+            )
+        elif (
+            value := COUNT_CACHE.get(key := (model, query, limit, offset))
+        ) is not None:
+            kind = 'cached'
+        else:
+            kind = 'exact'
+            value = await self.Session.scalar(statement, params) or 0
+            COUNT_CACHE.set(
+                key, value, EndPointStatementBuilder.tables(model, query)
+            )
+        return Response(str(value), headers={'X-Count-Kind': kind})
+
+    async def _estimate(
+        self: Self,
+        model: Union[Type[BaseInterface], Table],
+        query: str,
+        /,
+        *,
+        limit: int,
+        offset: int,
+    ) -> int:
+        if not query:
+            # Statistics are missing until the table is analyzed.
+            reltuples = await self.Session.scalar(
+                text(
+                    'SELECT reltuples FROM pg_class '
+                    'WHERE oid = to_regclass(:name)'
+                ),
+                dict(
+                    name=self.engine.dialect.identifier_preparer.format_table(
+                        FieldIndex.of(model).table
+                    )
+                ),
+            )
+            if reltuples is not None and reltuples >= 0:
+                value = max(int(reltuples) - offset, 0)
+                return min(value, limit) if limit else value
+
+        statement, params, *_ = EndPointStatementBuilder.select(
+            model, query, limit=limit, offset=offset
+        )
+        plan = await self.Session.scalar(_Explain(statement), params)
+        if isinstance(plan, (str, bytes)):
+            plan = loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    async def _delete(
+        self: Self,
+        model: Union[Type[BaseInterface], Table],
+        /,
+    ) -> Response:
+        query = self.request.url.query
+        preferences = self._get_preferences()
+        if preferences.get('delete') != 'chunked':
+            async with self.Session.begin():
+                await self._guard_all_rows(model, query, 'Deleting')
+                await self.Session.execute(
+                    EndPointStatementBuilder.delete(model, query)
+                )
+            await self.invalidate(model)
+            return Response(None, HTTP_204_NO_CONTENT)
+
+        try:
+            size = int(preferences.get('chunk-size', DELETE_CHUNK_SIZE))
+            pause = float(preferences.get('chunk-pause', DELETE_CHUNK_PAUSE))
+        except ValueError:
+            size = 0
+        if size < 1 or not pause >= 0:
+            raise HTTPException(HTTP_400_BAD_REQUEST, 'Chunk is invalid.')
+        elif not FieldIndex.of(model).table.primary_key.columns:
+            raise HTTPException(
+                HTTP_400_BAD_REQUEST, 'Chunked delete requires a primary key.'
+            )
+        async with self.Session.begin():
+            await self._guard_all_rows(model, query, 'Deleting')
+
+        # The body is iterated in another task, so the scoped session
+        # is resolved here while the request task is still current.
+        session: AsyncSession = self.Session()
+        statement = EndPointStatementBuilder.delete(model, query, limit=size)
 
+        async def iterate() -> AsyncIterator[bytes]:
+            total = 0
             try:
-                response = self._get_response_class()
-                if is_raw:
-                    result = await self.Session.execute(statement)
-                    return response(list(map(list, result.all())))
-                return response((await self.Session.scalars(statement)).all())
-            except TypeError as _:
+                while True:
+                    # Every chunk is committed on its own to release the
+                    # locks and let the WAL be recycled in between.
+                    async with session.begin():
+                        deleted = (await session.execute(statement)).rowcount
+                    total += deleted
+                    line = dict(deleted=deleted, total=total)
+                    if not deleted:
+                        # Rows locked by other transactions were skipped.
+                        async with session.begin():
+                            line['remaining'] = await session.scalar(
+                                EndPointStatementBuilder.count(model, query)
+                            )
+                    yield dumps(line) + b'\n'
+                    if not deleted:
+                        break
+                    await sleep(pause)
+            finally:
+                await self.invalidate(model)
+
+        return StreamingResponse(iterate(), media_type=NDJSON_MEDIA_TYPE)
+
+    async def _guard_all_rows(
+        self: Self,
+        model: Union[Type[BaseInterface], Table],
+        query: str,
+        action: str,
+        /,
+    ) -> None:
+        # Queries without filters, like `?id`, still reach every row.
+        if (
+            DELETE_GUARD_THRESHOLD > 0
+            and 'force' not in self._get_preferences()
+            and EndPointStatementBuilder._where(model, query) is None
+            and await self._estimate(model, '', limit=0, offset=0)
+            > DELETE_GUARD_THRESHOLD
+        ):
+            raise HTTPException(
+                HTTP_400_BAD_REQUEST,
+                f'{action} all rows of a large table requires '
+                '`Prefer: force`.',
+            )
+
+    @classmethod
+    async def invalidate(
+        cls: Type[Self],
+        model: Union[Type[BaseInterface], Table],
+        /,
+    ) -> None:
+        field_index = FieldIndex.of(model)
+        tables = {field_index.table}
+        for relationship in (field_index.relationships or {}).values():
+            tables.add(relationship.mapper.local_table)
+            if isinstance(relationship.secondary, Table):
+                tables.add(relationship.secondary)
+        for table in field_index.table.metadata.tables.values():
+            if any(
+                key.column.table is field_index.table
+                for key in table.foreign_keys
+            ):
+                tables.add(table)
+        COUNT_CACHE.invalidate(*tables)
+        await RESPONSE_CACHE.invalidate(tables)
+
+    async def _stream(
+        self: Self,
+        statement: Select,
+        params: Dict[str, Any],
+        is_raw: bool,
+        /,
+        *,
+        ndjson: bool,
+    ) -> StreamingResponse:
+        # The body is iterated in another task, so the scoped session
+        # is resolved here while the request task is still current.
+        session: AsyncSession = self.Session()
+        statement = statement.execution_options(yield_per=STREAM_CHUNK_SIZE)
+        result = await (
+            session.stream(statement, params)
+            if is_raw
+            else session.stream_scalars(statement, params)
+        )
+
+        async def iterate() -> AsyncIterator[bytes]:
+            separator = b'\n' if ndjson else b','
+            try:
+                if not ndjson:
+                    yield b'['
+                first = True
+                async for partition in result.partitions():
+                    chunk = separator.join(
+                        dumps(list(_) if is_raw else _, default=serialize)
+                        for _ in partition
+                    )
+                    if ndjson:
+                        yield chunk + separator
+                    else:
+                        yield chunk if first else separator + chunk
+                    first = False
+                if not ndjson:
+                    yield b']'
+            finally:
+                await result.close()
+
+        return StreamingResponse(
+            iterate(),
+            media_type=NDJSON_MEDIA_TYPE if ndjson else 'application/json',
+        )
+
+    def _accepts(self: Self, media_type: str, /) -> bool:
+        return any(
+            _.split(';')[0].strip().lower() == media_type
+            for _ in self.request.headers.get('accept', '').split(',')
+        )
+
+    def _not_modified(self: Self, etag: str, /) -> Response:
+        return Response(None, HTTP_304_NOT_MODIFIED, {'ETag': etag})
+
+    def _get_media_type(self: Self, /) -> Optional[str]:
+        for media_type in (
+            COLUMNAR_MEDIA_TYPE,
+            MSGPACK_MEDIA_TYPE,
+            ARROW_MEDIA_TYPE,
+        ):
+            if not self._accepts(media_type):
+                continue
+            elif media_type == COLUMNAR_MEDIA_TYPE or is_available(media_type):
+                return media_type
+            elif not self._accepts('application/json') and not self._accepts(
+                '*/*'
+            ):
+                raise HTTPException(
+                    HTTP_406_NOT_ACCEPTABLE,
+                    f'Media type `{media_type}` is not available.',
+                )
+        return None
+
+    def _get_preferences(self: Self, /) -> Dict[str, str]:
+        preferences: Dict[str, str] = {}
+        for header in self.request.headers.getlist('prefer'):
+            for preference in header.replace(';', ',').split(','):
+                name, _, value = preference.partition('=')
+                if name := name.strip().lower():
+                    preferences[name] = value.strip().strip('"')
+        return preferences
+
+    def _get_response_class(self: Self, /) -> Type[Response]:
+        return (
+            getattr(self.app.router, 'default_response_class', None)
+            or ORJSONResponse
+        )
+
+    @classmethod
+    def build_routes(
+        cls: Type[Self],
+        metadata: Union[MetaData, Any],
+        /,
+        *,
+        inflect: bool = ROUTE_INFLECT,
+    ) -> None:
+        models: Dict[Table, Type[BaseInterface]] = {}
+        if not isinstance(metadata, MetaData):
+            for mapper in metadata.registry.mappers:
+                models.setdefault(mapper.local_table, mapper.class_)
+            metadata = metadata.metadata
+
+        routes: Dict[str, Union[Table, Type[BaseInterface]]] = {}
+        for table_name, table in metadata.tables.items():
+            routes.setdefault(table_name.casefold(), models.get(table, table))
+        for table in metadata.tables.values():
+            aliases = [table.name]
+            if inflect:
+                *words, word = table.name.split('_')
+                for alias in (
+                    BaseInterface.inflect.singular_noun(word),
+                    BaseInterface.inflect.plural(word),
+                ):
+                    if alias:
+                        aliases.append('_'.join((*words, alias)))
+            for alias in aliases:
+                routes.setdefault(alias.casefold(), models.get(table, table))
+        cls._routes = MappingProxyType(routes)
+
+    def _get_model_name(self: Self, route: str, /) -> Optional[str]:
+        if (model := self._get_model(route)) is None:
+            return None
+        return FieldIndex.of(model).table.name
+
+    def _get_model(
+        self: Self,
+        route: str,
+        /,
+    ) -> Union[None, Table, Type[BaseInterface]]:
+        if not self._routes:
+            self.build_routes(
+                self.metadata if self.Base is None else self.Base
+            )
+        return self._routes.get(route.casefold())
+
+    async def _ingest(
+        self: Self,
+        model: Union[Type[BaseInterface], Table],
+        /,
+        *,
+        csv: bool,
+    ) -> Response:
+        preferences = self._get_preferences()
+        try:
+            size = int(preferences.get('chunk-size', INGEST_CHUNK_SIZE))
+        except ValueError:
+            size = 0
+        if size < 1:
+            raise HTTPException(HTTP_400_BAD_REQUEST, 'Chunk size is invalid.')
+
+        upsert = self.request.method == 'PUT'
+        total = 0
+
+        async def write(items: List[Dict[str, Any]], /) -> None:
+            if (rows := self._get_rows(model, items, total)) is not None:
+                await self._insert(model, rows, upsert=upsert)
+                return
+            elif not upsert and (graph := self._plan_graph(model, items)):
+                await self._insert_graph(graph)
+                return
+            for item in items:
+                item = self._modify_item(model, item)
+                if upsert:
+                    await self.Session.merge(item)
+                else:
+                    self.Session.add(item)
+            await self.Session.flush()
+            self.Session.expunge_all()
+
+        items: List[Dict[str, Any]] = []
+        per_chunk = preferences.get('commit') == 'chunk'
+
+        async def flush() -> None:
+            nonlocal items, total
+            if per_chunk:
+                async with self.Session.begin():
+                    await write(items)
+            else:
+                await write(items)
+            total, items = total + len(items), []
+
+        async with nullcontext() if per_chunk else self.Session.begin():
+            async for item in (
+                self._read_csv(model) if csv else self._read_ndjson()
+            ):
+                items.append(item)
+                if len(items) >= size:
+                    await flush()
+            if items:
+                await flush()
+        await self.invalidate(model)
+        return Response(
+            None, HTTP_204_NO_CONTENT, headers={'X-Row-Count': str(total)}
+        )
+
+    async def _read_lines(self: Self, /) -> AsyncIterator[str]:
+        buffer = b''
+        async for chunk in self.request.stream():
+            *lines, buffer = (buffer + chunk).split(b'\n')
+            for line in lines:
+                yield line.decode()
+        if buffer:
+            yield buffer.decode()
+
+    async def _read_ndjson(self: Self, /) -> AsyncIterator[Dict[str, Any]]:
+        number = 0
+        async for line in self._read_lines():
+            number += 1
+            if not line.strip():
+                continue
+            try:
+                if not isinstance(item := loads(line), dict):
+                    raise ValueError
+            except ValueError as _:
                 raise HTTPException(
-                    HTTP_500_INTERNAL_SERVER_ERROR,
-                    'Request was valid, but response could not be processed '
-                    'correctly.',
+                    HTTP_400_BAD_REQUEST, f'Line {number} is invalid.'
                 ) from _
+            yield item
+
+    async def _read_csv(
+        self: Self,
+        model: Union[Type[BaseInterface], Table],
+        /,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        field_index = FieldIndex.of(model)
+        paths: Optional[List[FieldPath]] = None
+        number = 0
+        record = ''
+        async for line in self._read_lines():
+            number += 1
+            # Quoted values may span several lines.
+            if (record := record + line).count('"') % 2:
+                record += '\n'
+                continue
+            values, record = next(reader([record.rstrip('\r')])), ''
+            if not values:
+                continue
+            elif paths is None:
+                paths = []
+                for name in values:
+                    if name not in field_index.columns:
+                        raise HTTPException(
+                            HTTP_400_BAD_REQUEST,
+                            f"Field '{name}' is not present in the "
+                            f"'{field_index.table.name}' table. "
+                            + field_index.available,
+                        )
+                    paths.append(field_index.paths[name])
+                continue
+            elif len(values) != len(paths):
+                raise HTTPException(
+                    HTTP_400_BAD_REQUEST, f'Line {number} is invalid.'
+                )
+
+            item: Dict[str, Any] = {}
+            for path, value in zip(paths, values):
+                try:
+                    if path.python_type is None or issubclass(
+                        path.python_type, str
+                    ):
+                        item[path.attribute.key] = value
+                    elif not value:
+                        item[path.attribute.key] = None
+                    elif path.converter is not None:
+                        item[path.attribute.key] = path.converter(value)
+                    else:
+                        item[path.attribute.key] = value
+                except (ValueError, ArithmeticError) as _:
+                    raise HTTPException(
+                        HTTP_400_BAD_REQUEST,
+                        f'Line {number}: value of {path.attribute.key} is '
+                        'invalid.',
+                    ) from _
+            yield item
+
+    def _coerce_item(
+        self: Self,
+        model: Union[Type[BaseInterface], Table],
+        item: dict[str, Any],
+        /,
+        field_chain: tuple[str, ...] = (),
+        *,
+        check: bool = True,
+    ) -> dict[str, Any]:
+        field_index = FieldIndex.of(model)
+        coerced: dict[str, Any] = {}
+        for key, coercer, required in field_index.coercions:
+            if (value := item.get(key)) is None:
+                if required and check and not field_chain:
+                    raise HTTPException(
+                        HTTP_400_BAD_REQUEST,
+                        'Table `{name}` requires fields: {fields}.'.format(
+                            name=field_index.table.name,
+                            fields=field_index.required,
+                        ),
+                    )
+            elif coercer is not None:
+                try:
+                    value = coercer(value)
+                except (ValueError, TypeError, OverflowError) as _:
+                    raise HTTPException(
+                        HTTP_400_BAD_REQUEST,
+                        f"Value of field '{key}' is invalid.",
+                    ) from _
+            coerced[key] = value
+        for key, value in item.items():
+            if key not in field_index.columns:
+                coerced[key] = value
+        return coerced
+
+    def _get_rows(
+        self: Self,
+        model: Union[Type[BaseInterface], Table],
+        items: List[Any],
+        /,
+        start: int = 0,
+    ) -> Optional[List[Dict[str, Any]]]:
+        field_index = FieldIndex.of(model)
+        rows: List[Dict[str, Any]] = []
+        for index, item in enumerate(items, start):
+            if not isinstance(item, dict):
+                raise HTTPException(
+                    HTTP_400_BAD_REQUEST,
+                    f'Root element #{index} should be a dictionary.',
+                )
+            row: Dict[str, Any] = {}
+            for field, value in self._coerce_item(model, item).items():
+                if field not in item:
+                    continue
+                elif field in field_index.columns:
+                    row[field] = value
+                elif field in (field_index.relationships or {}):
+                    if value:
+                        return None
+                else:
+                    raise HTTPException(
+                        HTTP_400_BAD_REQUEST,
+                        f"Field '{field}' is not present in the "
+                        f"'{field_index.table.name}' table. "
+                        + field_index.available,
+                    )
+            rows.append(row)
+        return rows
+
+    async def _insert(
+        self: Self,
+        model: Union[Type[BaseInterface], Table],
+        rows: List[Dict[str, Any]],
+        /,
+        *,
+        returning: bool = False,
+        upsert: bool = False,
+    ) -> List[Optional[Dict[str, Any]]]:
+        table = FieldIndex.of(model).table
+        groups: Dict[Tuple[str, ...], List[int]] = {}
+        for index, row in enumerate(rows):
+            key = tuple(
+                field
+                for field, value in row.items()
+                if upsert or value is not None
+            )
+            groups.setdefault(key, []).append(index)
+
+        keys: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+        for fields, indexes in groups.items():
+            values = [{_: rows[index][_] for _ in fields} for index in indexes]
+            statement = EndPointStatementBuilder.insert(
+                table, fields, upsert=upsert, returning=returning
+            )
+            if returning and fields:
+                returned = await self._insert_returning(
+                    table,
+                    fields,
+                    values,
+                    table.primary_key.columns,
+                    upsert=upsert,
+                )
+                for index, value in zip(indexes, returned):
+                    keys[index] = value
+            elif returning:
+                for index in indexes:
+                    result = await self.Session.execute(statement)
+                    keys[index] = dict(result.one()._mapping)
+            elif (
+                upsert
+                or len(values) < BULK_COPY_THRESHOLD
+                or not await self._copy(table, fields, values)
+            ):
+                await self.Session.execute(statement, values)
+        return keys
+
+    def _buffer(
+        self: Self,
+        model: Union[Type[BaseInterface], Table],
+        body: Any,
+        /,
+    ) -> Response:
+        rows = self._get_rows(
+            model, [body] if isinstance(body, dict) else list(body)
+        )
+        if rows is None:
+            raise HTTPException(
+                HTTP_400_BAD_REQUEST, 'Buffered writes accept flat rows only.'
+            )
+        elif not WRITE_BUFFER.append(
+            self.engine,
+            FieldIndex.of(model).table,
+            rows,
+            partial(self.invalidate, model),
+        ):
+            raise HTTPException(
+                HTTP_503_SERVICE_UNAVAILABLE,
+                'Write buffer is full.',
+                headers={'Retry-After': '1'},
+            )
+        return Response(
+            None,
+            HTTP_202_ACCEPTED,
+            headers={'Preference-Applied': 'respond-async'},
+        )
+
+    async def _spool(
+        self: Self,
+        model: Union[Type[BaseInterface], Table],
+        rows: List[Dict[str, Any]],
+        /,
+    ) -> Response:
+        try:
+            async with self.Session.begin():
+                # Waiting longer for a connection is treated as an outage.
+                await wait_for(
+                    self.Session.connection(), SPOOL_CONNECT_TIMEOUT
+                )
+                await self._insert(model, rows)
+        except Exception as exception:
+            if not is_unavailable(exception):
+                raise
+            await SPOOL.append(self.engine, FieldIndex.of(model).table, rows)
+            return Response(None, HTTP_202_ACCEPTED)
+        await self.invalidate(model)
+        return Response(None, HTTP_204_NO_CONTENT)
+
+    async def _update(
+        self: Self,
+        model: Union[Type[BaseInterface], Table],
+        body: Any,
+        /,
+    ) -> Response:
+        if not isinstance(body, dict):
+            raise HTTPException(
+                HTTP_400_BAD_REQUEST, 'Root element should be a dictionary.'
+            )
+        field_index = FieldIndex.of(model)
+        values: Dict[str, Any] = {}
+        for key, value in self._coerce_item(model, body, check=False).items():
+            if key not in body:
+                continue
+            elif key in field_index.columns:
+                values[key] = value
+            elif key in (field_index.relationships or {}):
+                raise HTTPException(
+                    HTTP_400_BAD_REQUEST,
+                    f"Relationship '{key}' cannot be updated by filters.",
+                )
+            else:
+                raise HTTPException(
+                    HTTP_400_BAD_REQUEST,
+                    f"Field '{key}' is not present in the "
+                    f"'{field_index.table.name}' table. "
+                    + field_index.available,
+                )
+        if not values:
+            return Response(None, HTTP_204_NO_CONTENT)
+
+        preference = self._get_preferences().get('return')
+        statement = EndPointStatementBuilder.update(
+            model,
+            self.request.url.query,
+            values,
+            returning=preference == 'keys',
+        )
+        async with self.Session.begin():
+            await self._guard_all_rows(
+                model, self.request.url.query, 'Updating'
+            )
+            result = await self.Session.execute(statement)
+            if preference == 'keys':
+                keys = [dict(_._mapping) for _ in result]
+                row_count = len(keys)
+            else:
+                row_count = result.rowcount
+        await self.invalidate(model)
+
+        headers = {'X-Row-Count': str(row_count)}
+        if preference == 'keys':
+            return self._get_response_class()(keys, headers=headers)
+        elif preference == 'count':
+            return Response(str(row_count), headers=headers)
+        return Response(None, HTTP_204_NO_CONTENT, headers)
+
+    def _plan_graph(
+        self: Self,
+        model: Union[Type[BaseInterface], Table],
+        items: List[Any],
+        /,
+    ) -> Optional[Graph]:
+        tables: List[Table] = []
+        rows: List[Dict[str, Any]] = []
+        dependencies: List[List[Tuple[int, Tuple[Tuple[str, str], ...]]]] = []
+        supported = True
+
+        def add(
+            model: Union[Type[BaseInterface], Table],
+            item: Any,
+            field_chain: Tuple[str, ...],
+            /,
+        ) -> int:
+            nonlocal supported
+            if not isinstance(item, dict):
+                raise HTTPException(
+                    HTTP_400_BAD_REQUEST,
+                    '%s element should be a dictionary.'
+                    % ('.'.join(field_chain) or 'Root'),
+                )
+            field_index = FieldIndex.of(model)
+            index = len(rows)
+            tables.append(field_index.table)
+            rows.append(row := {})
+            dependencies.append([])
+            for key, value in self._coerce_item(
+                model, item, field_chain, check=False
+            ).items():
+                if key in field_index.columns:
+                    if key in item:
+                        row[key] = value
+                    continue
+                elif (
+                    relationship := (field_index.relationships or {}).get(key)
+                ) is None:
+                    raise HTTPException(
+                        HTTP_400_BAD_REQUEST,
+                        f"Field '{key}' is not present in the "
+                        f"'{field_index.table.name}' table. "
+                        + field_index.available,
+                    )
+                elif not value:
+                    continue
+                elif relationship.secondary is not None or (
+                    relationship.direction not in {MANYTOONE, ONETOMANY}
+                ):
+                    supported = False
+                    continue
+                elif isinstance(value, dict):
+                    value = [value]
+                elif not relationship.uselist or not isinstance(value, list):
+                    raise HTTPException(
+                        HTTP_400_BAD_REQUEST,
+                        f'{".".join((*field_chain, key))} element should be '
+                        'a dictionary.',
+                    )
+
+                pairs = tuple(
+                    (local.key, remote.key)
+                    for local, remote in relationship.local_remote_pairs
+                )
+                for child in value:
+                    child_index = add(
+                        relationship.entity.class_, child, (*field_chain, key)
+                    )
+                    if relationship.direction is MANYTOONE:
+                        dependencies[index].append((child_index, pairs))
+                    else:
+                        dependencies[child_index].append(
+                            (
+                                index,
+                                tuple(
+                                    (remote, local) for local, remote in pairs
+                                ),
+                            )
+                        )
+            return index
+
+        roots = tuple(add(model, item, ()) for item in items)
+        if not supported:
+            return None
+
+        levels: List[int] = [-1] * len(rows)
+
+        def get_level(index: int, /) -> int:
+            if levels[index] < 0:
+                levels[index] = 1 + max(
+                    (
+                        get_level(dependency)
+                        for dependency, _ in dependencies[index]
+                    ),
+                    default=-1,
+                )
+            return levels[index]
+
+        grouped_levels: List[List[int]] = []
+        for index, row in enumerate(rows):
+            # Wired foreign keys are not required from the client.
+            wired = {
+                own for _, pairs in dependencies[index] for own, _ in pairs
+            }
+            field_index = FieldIndex.of(tables[index])
+            for key, _, required in field_index.coercions:
+                if required and key not in wired and row.get(key) is None:
+                    raise HTTPException(
+                        HTTP_400_BAD_REQUEST,
+                        'Table `{name}` requires fields: {fields}.'.format(
+                            name=field_index.table.name,
+                            fields=field_index.required,
+                        ),
+                    )
+            while len(grouped_levels) <= (level := get_level(index)):
+                grouped_levels.append([])
+            grouped_levels[level].append(index)
+        return Graph(
+            tuple(tables),
+            tuple(rows),
+            tuple(map(tuple, dependencies)),
+            tuple(map(tuple, grouped_levels)),
+            roots,
+        )
+
+    async def _insert_graph(
+        self: Self,
+        graph: Graph,
+        /,
+    ) -> List[Dict[str, Any]]:
+        inserted: List[Optional[Dict[str, Any]]] = [None] * len(graph.rows)
+        # Only the rows that are referenced or reported need RETURNING, the
+        # rest are written by the flat bulk insert.
+        returned = set(graph.roots)
+        for dependencies in graph.dependencies:
+            returned.update(dependency for dependency, _ in dependencies)
+        for level in graph.levels:
+            groups: Dict[Tuple[Table, Tuple[str, ...]], List[int]] = {}
+            leaves: Dict[Table, List[Dict[str, Any]]] = {}
+            for index in level:
+                row = graph.rows[index]
+                for dependency, pairs in graph.dependencies[index]:
+                    for own, other in pairs:
+                        row[own] = inserted[dependency][other]
+                if index not in returned:
+                    leaves.setdefault(graph.tables[index], []).append(row)
+                    continue
+                fields = tuple(
+                    _ for _, value in row.items() if value is not None
+                )
+                groups.setdefault((graph.tables[index], fields), []).append(
+                    index
+                )
+
+            for table, rows in leaves.items():
+                await self._insert(table, rows)
+            for (table, fields), indexes in groups.items():
+                if not fields:
+                    statement = insert(table).returning(*table.columns)
+                    for index in indexes:
+                        result = await self.Session.execute(statement)
+                        inserted[index] = dict(result.one()._mapping)
+                    continue
+                values = await self._insert_returning(
+                    table,
+                    fields,
+                    [
+                        {_: graph.rows[index][_] for _ in fields}
+                        for index in indexes
+                    ],
+                    table.columns,
+                )
+                for index, value in zip(indexes, values):
+                    inserted[index] = value
 
-    def _get_response_class(self: Self, /) -> Type[Response]:
-        return (
-            getattr(self.app.router, 'default_response_class', None)
-            or ORJSONResponse
+        return [
+            {
+                _.key: inserted[index][_.key]
+                for _ in graph.tables[index].primary_key.columns
+            }
+            for index in graph.roots
+        ]
+
+    async def _insert_returning(
+        self: Self,
+        table: Table,
+        fields: Tuple[str, ...],
+        rows: List[Dict[str, Any]],
+        columns: Iterable[Column],
+        /,
+        *,
+        upsert: bool = False,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Return the `columns` of the inserted `rows` in the given order."""
+        returned: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+        assigned = (
+            await self._assign_keys(table, fields, rows)
+            if len(rows) > 1
+            else None
+        )
+        statement = EndPointStatementBuilder.insert(
+            table, assigned or fields, upsert=upsert, returning=True
         )
+        if extra_columns := [_ for _ in columns if not _.primary_key]:
+            statement = statement.returning(*extra_columns)
+        if assigned is None:
+            for index, row in enumerate(rows):
+                result = await self.Session.execute(statement.values(row))
+                if (value := result.one_or_none()) is not None:
+                    returned[index] = dict(value._mapping)
+            return returned
 
-    def _get_model_name(self: Self, route: str, /) -> Optional[str]:
-        if isinstance(table := self._get_model(route), BaseInterface):
-            table = table.__table__
-        return table.name if isinstance(table, Table) else None
+        # RETURNING keeps no order, the rows are matched by their keys.
+        primary_keys = [_.key for _ in table.primary_key.columns]
+        indexes = {
+            tuple(row[_] for _ in primary_keys): index
+            for index, row in enumerate(rows)
+        }
+        size = EndPointStatementBuilder.batch_size(table, assigned)
+        for start in range(0, len(rows), size):
+            result = await self.Session.execute(
+                statement.values(rows[start : start + size])
+            )
+            for value in result:
+                mapping = dict(value._mapping)
+                index = indexes[tuple(mapping[_] for _ in primary_keys)]
+                returned[index] = mapping
+        return returned
 
-    def _get_model(
+    async def _assign_keys(
         self: Self,
-        route: str,
+        table: Table,
+        fields: Tuple[str, ...],
+        rows: List[Dict[str, Any]],
         /,
-    ) -> Union[None, Table, BaseInterface]:
-        if route not in self.__class__._tables_registry:
-            registry = self.Base.registry if self.Base is not None else None
-            for table_name, table in self.metadata.tables.items():
-                if route == table_name.lower():
-                    if registry is not None:
-                        for decl in registry._class_registry.data.values():
-                            if decl.key.startswith('_'):
-                                pass
-                            elif (model := decl()).__tablename__ == table_name:
-                                self.__class__._tables_registry[route] = model
-                                break
-                        else:
-                            self.__class__._tables_registry[route] = table
-                        break
-                    self.__class__._tables_registry[route] = table
-                    break
+    ) -> Optional[Tuple[str, ...]]:
+        """Set the missing primary keys of `rows` before they are inserted."""
+        if not (primary_keys := table.primary_key.columns):
+            return None
+        missing = [_ for _ in primary_keys if _.key not in fields]
+        for column in missing:
+            if column.default is not None and column.default.is_callable:
+                values = [column.default.arg(None) for _ in rows]
+            elif column.default is not None and column.default.is_sequence:
+                values = await self._get_sequence_values(
+                    column.default.next_value(), len(rows)
+                )
+            elif column.default is None and column.server_default is None:
+                values = await self._get_sequence_values(
+                    func.nextval(
+                        func.pg_get_serial_sequence(
+                            table.fullname, column.name
+                        )
+                    ),
+                    len(rows),
+                )
             else:
                 return None
-        return self.__class__._tables_registry[route]
+            if any(_ is None for _ in values):
+                return None
+            for row, value in zip(rows, values):
+                row[column.key] = value
+        return (*fields, *(_.key for _ in missing))
+
+    async def _get_sequence_values(
+        self: Self,
+        value: ColumnClause,
+        size: int,
+        /,
+    ) -> List[Any]:
+        return list(
+            await self.Session.scalars(
+                select(value).select_from(func.generate_series(1, size))
+            )
+        )
+
+    async def _copy(
+        self: Self,
+        table: Table,
+        fields: Tuple[str, ...],
+        values: List[Dict[str, Any]],
+        /,
+    ) -> bool:
+        # Python-side defaults are not applied by COPY, so they are filled
+        # here, while server-side defaults apply to the omitted columns.
+        defaults = [
+            column
+            for column in table.columns
+            if column.key not in fields
+            and column.default is not None
+            and not column.default.is_sequence
+        ]
+        if any(_.default.is_clause_element for _ in defaults):
+            return False
+        columns = [*(table.columns[_] for _ in fields), *defaults]
+        dialect = self.engine.dialect
+        processors = [
+            _.type.dialect_impl(dialect).bind_processor(dialect)
+            for _ in columns
+        ]
+        records = []
+        for value in values:
+            record = [value[_] for _ in fields]
+            for column in defaults:
+                record.append(
+                    column.default.arg(None)
+                    if column.default.is_callable
+                    else column.default.arg
+                )
+            records.append(
+                tuple(
+                    _ if processor is None else processor(_)
+                    for processor, _ in zip(processors, record)
+                )
+            )
+
+        connection = await self.Session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.connection.driver_connection
+        if not driver_connection.is_in_transaction():
+            # The adapter begins its transaction on the first statement, so
+            # COPY would otherwise run outside of it and commit on its own.
+            await connection.exec_driver_sql('SELECT 1')
+        await driver_connection.copy_records_to_table(
+            table.name,
+            records=records,
+            columns=[_.name for _ in columns],
+            schema_name=table.schema,
+        )
+        return True
 
     def _modify_item(
         self: Self,
@@ -257,65 +1649,24 @@ class EndPoint(object):
         /,
         field_chain: tuple[str, ...] = (),
     ) -> dict[str, Any]:
-        column_keys, relationship_keys = _get_keys(model)
+        field_index = FieldIndex.of(model)
         if isinstance(item, dict):
-            item = dict.fromkeys(column_keys) | item
+            item = self._coerce_item(model, item, field_chain)
             for field, value in dict(item).items():
-                if field in column_keys:
-                    if field in {'created_at', 'updated_at'}:
-                        del item[field]
-                        continue
-                    column = column_keys[field]
-                    if (
-                        (not field_chain and value is None)
-                        and column.default is None
-                        and not column.nullable
-                        and column.autoincrement is not True
-                    ):
-                        raise HTTPException(
-                            HTTP_400_BAD_REQUEST,
-                            'Table `{name}` requires fields: '
-                            '{fields}.'.format(
-                                name=model.name
-                                if isinstance(model, Table)
-                                else model.__tablename__,
-                                fields=', '.join(
-                                    f'`{column.key}`'
-                                    for column in column_keys.values()
-                                    if column.default is None
-                                    and not column.nullable
-                                    and column.autoincrement is not True
-                                ),
-                            ),
-                        )
-
-                    ctype = None
-                    with suppress(NotImplementedError):
-                        ctype = column.type.python_type
-                    if ctype is None or isinstance(value, (ctype, type(None))):
-                        pass
-                    elif ctype == date:
-                        item[field] = isoparse(value).date()
-                    elif ctype == time:
-                        item[field] = isoparse(value).time()
-                    elif ctype == datetime:
-                        item[field] = isoparse(value)
-                    elif ctype == timedelta:
-                        if isinstance(value, (int, float)):
-                            item[field] = timedelta(seconds=value)
+                if field in field_index.columns:
                     continue
-
-                elif relationship_keys is None:
+                elif field_index.relationships is None:
                     raise HTTPException(
                         HTTP_500_INTERNAL_SERVER_ERROR,
-                        f"Mapper for table '{model.name}' is not present.",
+                        f"Mapper for table '{field_index.table.name}' is not "
+                        'present.',
                     )
-                elif relationship := relationship_keys.get(field):
+                elif relationship := field_index.relationships.get(field):
                     if not value:
                         del item[field]
                         continue
                     try:
-                        item[field] = self.modify_item(
+                        item[field] = self._modify_item(
                             relationship.entity.class_,
                             value,
                             (*field_chain, field),
@@ -337,7 +1688,7 @@ class EndPoint(object):
                         f'%s element #{index} should be a dictionary.'
                         % ('.'.join(field_chain) or 'Root'),
                     )
-                items.append(self.modify_item(model, item, field_chain))
+                items.append(self._modify_item(model, item, field_chain))
             return items
 
 
@@ -349,6 +1700,9 @@ class EndPointStatementBuilder(object):
     ]
     SerializedValue = Union[str, int, float]
     ColumnFilter = Tuple[SerializedValue, Union[str, operator]]
+    Shape = Tuple[Tuple[Tuple[str, Optional[str], bool], ...], ...]
+    Binding = Tuple[int, str, FieldPath]
+    CursorKey = Tuple[FieldPath, bool]
 
     OperatorDict: Final[
         MappingProxyType[str, Optional[operator]]
@@ -367,55 +1721,284 @@ class EndPointStatementBuilder(object):
         limit: int = 0,
         offset: int = 0,
         count: bool = False,
-    ) -> Tuple[ColumnClause, bool]:
-        registry, filters = cls._process(model, query)
+        cursor: Optional[str] = None,
+        render: bool = False,
+        validate: bool = False,
+    ) -> Tuple[ColumnClause, Dict[str, Any], bool, Tuple[CursorKey, ...]]:
+        shape, values, projection = cls._split(query)
+        statement, bindings, is_raw, keys = cls._select(
+            model,
+            shape,
+            projection,
+            bool(limit),
+            bool(offset),
+            count,
+            None if cursor is None else bool(cursor),
+            render,
+            validate,
+        )
+        params: Dict[str, Any] = {
+            f'p{index}': cls._convert_value(path, name, values[index])
+            for index, name, path in bindings
+        }
+        if limit:
+            params['limit'] = limit
+        if offset:
+            params['offset'] = offset
+        if cursor:
+            for index, value in enumerate(cls.decode_cursor(keys, cursor)):
+                params[f'c{index}'] = value
+        return statement, params, is_raw, keys
+
+    @staticmethod
+    def encode_cursor(keys: Tuple[CursorKey, ...], item: Any, /) -> str:
+        values: List[Optional[str]] = []
+        for path, _ in keys:
+            if isinstance(value := getattr(item, path.attribute.key), bool):
+                values.append('true' if value else 'false')
+            elif isinstance(value, (date, time)):
+                values.append(value.isoformat())
+            elif isinstance(value, timedelta):
+                values.append(str(value.total_seconds()))
+            else:
+                values.append(str(value))
+        return urlsafe_b64encode(dumps(values)).rstrip(b'=').decode()
+
+    @staticmethod
+    def decode_cursor(
+        keys: Tuple[CursorKey, ...],
+        cursor: str,
+        /,
+    ) -> List[Any]:
+        try:
+            values = loads(
+                urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            )
+            if not isinstance(values, list) or len(values) != len(keys):
+                raise ValueError
+            return [
+                value if path.converter is None else path.converter(value)
+                for (path, _), value in zip(keys, values)
+            ]
+        except (ValueError, TypeError, ArithmeticError) as _:
+            raise HTTPException(
+                HTTP_400_BAD_REQUEST, 'Cursor is invalid.'
+            ) from _
+
+    @classmethod
+    @lru_cache(maxsize=STATEMENT_CACHE_SIZE)
+    def _select(
+        cls: Type[Self],
+        model: Union[Type[BaseInterface], Table],
+        shape: Shape,
+        projection: Tuple[str, ...],
+        limit: bool,
+        offset: bool,
+        count: bool,
+        cursor: Optional[bool],
+        render: bool,
+        validate: bool,
+        /,
+    ) -> Tuple[ColumnClause, Tuple[Binding, ...], bool, Tuple[CursorKey, ...]]:
+        registry: Dict[cls.Key, List[ColumnClause]] = {}
+        bindings: List[cls.Binding] = []
         fields: list[InstrumentedAttribute] = []
-        join_options: set[RelationshipProperty] = set()
+        join_options: dict[InstrumentedAttribute, None] = {}
         load_options: list[selectinload] = []
         orderings: list[ColumnClause] = []
-        if not count:
-            for _orderings in registry.values():
-                orderings.extend(_orderings)
 
+        index = -1
+        field_index = FieldIndex.of(model)
         or_clauses: list[ColumnClause] = []
-        for group_filters in filters:
+        for group in shape:
             and_clauses: list[ColumnClause] = []
-            for (chain, field), (value, op) in group_filters:
+            for name, op_key, has_value in group:
+                index += 1
+                path = field_index.resolve(name)
+                chain, field = path.chain, path.field
+                if (key := (chain, field)) not in registry:
+                    registry[key] = []
                 if isinstance(field, Column):
+                    if path.python_type is None:
+                        raise HTTPException(
+                            HTTP_500_INTERNAL_SERVER_ERROR,
+                            f'Could not infer python type for {field.key}.',
+                        )
+                    if name.endswith('..'):
+                        registry[key].append(field.desc())
+                    elif name.endswith('.'):
+                        registry[key].append(field.asc())
                     for link in chain:
-                        if link not in join_options:
-                            join_options.add(link)
-                if isinstance(op, str):
+                        join_options.setdefault(link)
+
+                if op_key is None:
+                    if isinstance(field, Column):
+                        if cursor is None or not name.endswith('.'):
+                            fields.append(field)
+                    else:
+                        fields.append((*chain, field))
+                    continue
+
+                value = None
+                if isinstance(field, Column) and (
+                    has_value or issubclass(path.python_type, str)
+                ):
+                    value = bindparam(f'p{index}', type_=field.type)
+                    bindings.append((index, name, path))
+                if isinstance(op := cls.OperatorDict[op_key] or op_key, str):
                     if op == '@@':
                         clause = field.op(op)(func.to_tsquery(value))
                     else:
                         clause = field.op(op)(value)
-                elif op is not None:
-                    clause = op(field, value)
                 else:
-                    fields.append(
-                        field if isinstance(field, Column) else (*chain, field)
-                    )
-                    continue
+                    clause = op(field, value)
                 and_clauses.append(clause)
             if and_clauses:
                 or_clauses.append(and_(*and_clauses))
 
+        load_only_options: Dict[
+            Tuple[InstrumentedAttribute, ...], List[InstrumentedAttribute]
+        ] = {}
+        for name in projection:
+            path = field_index.resolve(name)
+            if isinstance(model, Table):
+                fields.append(path.field)
+            elif isinstance(path.field, Column):
+                load_only_options.setdefault(path.chain, []).append(
+                    path.attribute
+                )
+                if path.chain:
+                    fields.append(path.chain)
+            else:
+                load_only_options.setdefault((*path.chain, path.field), [])
+                fields.append((*path.chain, path.field))
+
+        if not count:
+            for _orderings in registry.values():
+                orderings.extend(_orderings)
+
         raw_select = any(isinstance(field, Column) for field in fields)
+        if raw_select and load_only_options:
+            raise HTTPException(
+                HTTP_400_BAD_REQUEST,
+                'Fields cannot be combined with column projections.',
+            )
+        keys: list[cls.CursorKey] = []
+        if cursor is not None:
+            if raw_select or isinstance(model, Table):
+                raise HTTPException(
+                    HTTP_400_BAD_REQUEST,
+                    'Cursor pagination is available only for object results.',
+                )
+            for (chain, field), _orderings in registry.items():
+                for ordering in _orderings:
+                    if chain:
+                        raise HTTPException(
+                            HTTP_400_BAD_REQUEST,
+                            'Cursor pagination cannot order by related '
+                            f"field '{field.key}'.",
+                        )
+                    elif field.nullable:
+                        raise HTTPException(
+                            HTTP_400_BAD_REQUEST,
+                            'Cursor pagination cannot order by nullable '
+                            f"field '{field.key}'.",
+                        )
+                    elif all(path.field is not field for path, _ in keys):
+                        keys.append(
+                            (
+                                field_index.paths[field.key],
+                                ordering.modifier is desc_op,
+                            )
+                        )
+            for column in field_index.table.primary_key.columns:
+                if all(path.field is not column for path, _ in keys):
+                    keys.append((field_index.paths[column.key], False))
+            orderings = [
+                path.field.desc() if descending else path.field.asc()
+                for path, descending in keys
+            ]
+            if cursor:
+                seek_clauses = [
+                    bindparam(f'c{index}', type_=path.field.type)
+                    for index, (path, _) in enumerate(keys)
+                ]
+                if len({descending for _, descending in keys}) == 1:
+                    columns = tuple_(*(path.field for path, _ in keys))
+                    seek = (
+                        columns < tuple_(*seek_clauses)
+                        if keys[0][1]
+                        else columns > tuple_(*seek_clauses)
+                    )
+                else:
+                    seek = or_(
+                        *(
+                            and_(
+                                *(
+                                    keys[_][0].field == seek_clauses[_]
+                                    for _ in range(index)
+                                ),
+                                path.field < seek_clauses[index]
+                                if descending
+                                else path.field > seek_clauses[index],
+                            )
+                            for index, (path, descending) in enumerate(keys)
+                        )
+                    )
+                or_clauses = [
+                    and_(or_(*or_clauses), seek) if or_clauses else seek
+                ]
         if not count:
             for field in fields:
                 if not isinstance(field, Column):
                     if raw_select:
                         for link in field:
-                            if link not in join_options:
-                                join_options.add(link)
+                            join_options.setdefault(link)
                     else:
                         option = selectinload(next(chain := iter(field)))
                         for link in chain:
                             option = option.selectinload(link)
                         load_options.append(option)
+            # Keys of the loaded relationships are required by selectinload.
+            for chain in {_ for _ in fields if not isinstance(_, Column)}:
+                for depth, link in enumerate(chain):
+                    if attributes := load_only_options.get(chain[:depth]):
+                        mapper = link.property.parent
+                        attributes.extend(
+                            mapper.get_property_by_column(_).class_attribute
+                            for _ in link.property.local_columns
+                        )
+            if attributes := load_only_options.get(()):
+                attributes.extend(path.attribute for path, _ in keys)
+            for chain, attributes in load_only_options.items():
+                if not attributes:
+                    continue
+                elif not chain:
+                    load_options.append(load_only(*attributes))
+                    continue
+                option = selectinload(chain[0])
+                for link in chain[1:]:
+                    option = option.selectinload(link)
+                load_options.append(option.load_only(*attributes))
 
-        if raw_select:
+        render = render and not (
+            raw_select or count or validate or isinstance(model, Table)
+        )
+        if validate:
+            # Only the keys and timestamps of the returned rows are selected.
+            table = field_index.table
+            result = [*table.primary_key.columns, table.columns.updated_at]
+        elif render:
+            tree: Dict[InstrumentedAttribute, Dict] = {}
+            for chain in fields:
+                subtree = tree
+                for link in chain:
+                    subtree = subtree.setdefault(link, {})
+            result = [
+                cls._render(model, (), tree, load_only_options).label('j'),
+                func.row_number().over(order_by=orderings or None).label('n'),
+            ]
+        elif raw_select:
             result = [
                 _ if isinstance(_, Column) else _[-1].property.entity.class_
                 for _ in fields
@@ -426,21 +2009,180 @@ class EndPointStatementBuilder(object):
             result = model
 
         statement = select(result)
+        if count and not raw_select and not limit and not offset:
+            statement = statement.select_from(model)
         for link in join_options:
             statement = statement.join(link)
         if or_clauses:
             statement = statement.where(or_(*or_clauses))
         if orderings:
             statement = statement.order_by(*orderings)
-        if load_options:
+        if load_options and not render and not validate:
             statement = statement.options(*load_options)
         if limit:
-            statement = statement.limit(limit)
+            statement = statement.limit(bindparam('limit', type_=Integer))
         if offset:
-            statement = statement.offset(offset)
+            statement = statement.offset(bindparam('offset', type_=Integer))
         if count and (raw_select or limit or offset):
             statement = select(sa_count()).select_from(statement)
-        return statement, raw_select or isinstance(model, Table)
+        if render:
+            rows = statement.subquery()
+            statement = select(
+                cast(
+                    func.coalesce(
+                        func.json_agg(aggregate_order_by(rows.c.j, rows.c.n)),
+                        literal_column("'[]'"),
+                    ),
+                    Text,
+                )
+            )
+        return (
+            statement,
+            tuple(bindings),
+            raw_select or isinstance(model, Table),
+            tuple(keys),
+        )
+
+    @classmethod
+    def _render(
+        cls: Type[Self],
+        entity: Any,
+        chain: Tuple[InstrumentedAttribute, ...],
+        tree: Dict[InstrumentedAttribute, Dict],
+        load_only_options: Dict[
+            Tuple[InstrumentedAttribute, ...], List[InstrumentedAttribute]
+        ],
+        /,
+    ) -> ColumnClause:
+        mapper = inspect(entity).mapper
+        keys = {_.key for _ in load_only_options.get(chain, ())}
+        pairs: List[Tuple[str, ColumnClause]] = []
+        for prop in mapper.column_attrs:
+            if keys and prop.key not in keys:
+                continue
+            column = getattr(entity, prop.key)
+            if isinstance(prop.columns[0].type, Interval):
+                column = func.extract('epoch', column)
+            pairs.append((prop.key, column))
+        links = {_.key: _ for _ in tree}
+        for prop in mapper.relationships:
+            if (link := links.get(prop.key)) is None:
+                pairs.append(
+                    (
+                        prop.key,
+                        literal_column(
+                            "'[]'::json" if prop.uselist else 'NULL'
+                        ),
+                    )
+                )
+                continue
+            target = aliased(prop.entity.class_)
+            primaryjoin, secondaryjoin, secondary = cls._get_joins(
+                prop, entity, target
+            )
+            value = cls._render(
+                target, (*chain, link), tree[link], load_only_options
+            )
+            subquery = select(
+                func.coalesce(func.json_agg(value), literal_column("'[]'"))
+                if prop.uselist
+                else value
+            ).select_from(target)
+            if secondary is not None:
+                subquery = subquery.join(secondary, secondaryjoin)
+            subquery = subquery.where(primaryjoin)
+            if not prop.uselist:
+                subquery = subquery.limit(1)
+            pairs.append((prop.key, subquery.scalar_subquery()))
+
+        # Functions in postgres accept at most 100 arguments.
+        objects = [
+            [_ for pair in pairs[index : index + 50] for _ in pair]
+            for index in range(0, len(pairs), 50)
+        ]
+        if len(objects) == 1:
+            return func.json_build_object(*objects[0], type_=JSON)
+        value = func.jsonb_build_object(*objects[0], type_=JSONB)
+        for arguments in objects[1:]:
+            value = value.op('||', return_type=JSONB)(
+                func.jsonb_build_object(*arguments, type_=JSONB)
+            )
+        return value
+
+    @staticmethod
+    def _get_joins(
+        prop: RelationshipProperty,
+        source: Any,
+        target: Any,
+        /,
+    ) -> Tuple[ColumnClause, Optional[ColumnClause], Optional[FromClause]]:
+        """Return the conditions of `prop` between the aliased entities."""
+        # The private method adapts self-referential and secondary joins to
+        # the aliases. It is checked against SQLAlchemy 1.4.39 as pinned in
+        # the requirements by `tests/test_render.py`, recheck on upgrades.
+        primaryjoin, secondaryjoin, *_, secondary, _ = prop._create_joins(
+            source_selectable=inspect(source).selectable,
+            dest_selectable=inspect(target).selectable,
+            alias_secondary=True,
+        )
+        return primaryjoin, secondaryjoin, secondary
+
+    @staticmethod
+    def insert(
+        table: Table,
+        fields: Tuple[str, ...],
+        /,
+        *,
+        upsert: bool = False,
+        returning: bool = False,
+    ) -> Insert:
+        statement = insert(table)
+        primary_keys = [_.key for _ in table.primary_key.columns]
+        if upsert and all(_ in fields for _ in primary_keys):
+            set_ = {
+                _: statement.excluded[_]
+                for _ in fields
+                if _ not in primary_keys
+            }
+            if set_:
+                for column in table.columns:
+                    if (
+                        column.key not in fields
+                        and column.onupdate is not None
+                    ):
+                        set_[column.key] = (
+                            column.onupdate.arg(None)
+                            if column.onupdate.is_callable
+                            else column.onupdate.arg
+                        )
+            elif returning:
+                # Conflicting rows are only returned when they are updated.
+                set_ = {_: statement.excluded[_] for _ in primary_keys}
+            statement = (
+                statement.on_conflict_do_update(
+                    index_elements=primary_keys, set_=set_
+                )
+                if set_
+                else statement.on_conflict_do_nothing(
+                    index_elements=primary_keys
+                )
+            )
+        if returning:
+            statement = statement.returning(*table.primary_key.columns)
+        return statement
+
+    @staticmethod
+    def batch_size(table: Table, fields: Tuple[str, ...], /) -> int:
+        # Postgres accepts at most 32767 parameters per statement, including
+        # the ones bound for the Python-side column defaults.
+        parameters = len(fields) + sum(
+            1
+            for _ in table.columns
+            if _.key not in fields
+            and _.default is not None
+            and (_.default.is_scalar or _.default.is_callable)
+        )
+        return 32767 // max(parameters, 1)
 
     @classmethod
     def delete(
@@ -448,11 +2190,74 @@ class EndPointStatementBuilder(object):
         model: Union[Type[BaseInterface], Table],
         /,
         query: str,
+        *,
+        limit: int = 0,
     ) -> ColumnClause:
+        statement = delete(model).execution_options(synchronize_session=False)
+        where = cls._where(model, query)
+        if limit:
+            # Rows locked by other transactions are skipped, not waited for.
+            primary_keys = FieldIndex.of(model).table.primary_key.columns
+            keys = select(*primary_keys).limit(limit)
+            if where is not None:
+                keys = keys.where(where)
+            statement = statement.where(
+                tuple_(*primary_keys).in_(
+                    keys.with_for_update(skip_locked=True)
+                )
+            )
+        elif where is not None:
+            statement = statement.where(where)
+        return statement
+
+    @classmethod
+    def count(
+        cls: Type[Self],
+        model: Union[Type[BaseInterface], Table],
+        /,
+        query: str,
+    ) -> Select:
+        statement = select(sa_count()).select_from(model)
+        if (where := cls._where(model, query)) is not None:
+            statement = statement.where(where)
+        return statement
+
+    @classmethod
+    def update(
+        cls: Type[Self],
+        model: Union[Type[BaseInterface], Table],
+        /,
+        query: str,
+        values: Dict[str, Any],
+        *,
+        returning: bool = False,
+    ) -> Update:
+        statement = (
+            update(model)
+            .values(values)
+            .execution_options(synchronize_session=False)
+        )
+        if (where := cls._where(model, query)) is not None:
+            statement = statement.where(where)
+        if returning:
+            statement = statement.returning(
+                *FieldIndex.of(model).table.primary_key.columns
+            )
+        return statement
+
+    @classmethod
+    def _where(
+        cls: Type[Self],
+        model: Union[Type[BaseInterface], Table],
+        query: str,
+        /,
+    ) -> Optional[ColumnClause]:
+        if not query:
+            return None
         registry, filters = cls._process(model, query)
         or_clauses: list[ColumnClause] = []
         for group_filters in filters:
-            and_clauses: list[ColumnClause] = []
+            clauses: Dict[Tuple[InstrumentedAttribute, ...], list] = {}
             for (chain, field), (value, op) in group_filters:
                 if isinstance(op, str):
                     if op == '@@':
@@ -463,14 +2268,120 @@ class EndPointStatementBuilder(object):
                     clause = op(field, value)
                 else:
                     continue
-                and_clauses.append(clause)
-            if and_clauses:
+                clauses.setdefault(chain, []).append(clause)
+
+            # Filters on relationships become EXISTS subqueries, the ones
+            # sharing a relationship are matched against the same row.
+            while chain := max(clauses, key=len, default=()):
+                *chain, attribute = chain
+                clause = and_(*clauses.pop((*chain, attribute)))
+                clauses.setdefault(tuple(chain), []).append(
+                    attribute.any(clause)
+                    if attribute.property.uselist
+                    else attribute.has(clause)
+                )
+            if and_clauses := clauses.get(()):
                 or_clauses.append(and_(*and_clauses))
+        return or_(*or_clauses) if or_clauses else None
 
-        statement = delete(model)
-        if or_clauses:
-            statement = statement.where(or_(*or_clauses))
-        return statement
+    @classmethod
+    def validator(
+        cls: Type[Self],
+        model: Union[Type[BaseInterface], Table],
+        /,
+        query: str,
+        *,
+        limit: int = 0,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> Optional[Tuple[Select, Dict[str, Any]]]:
+        field_index = FieldIndex.of(model)
+        shape, _, projection = cls._split(query)
+        chains: Dict[Tuple[InstrumentedAttribute, ...], None] = {}
+        names = [name for group in shape for name, op, _ in group if not op]
+        for name in (*names, *projection):
+            path = field_index.resolve(name)
+            chain = path.chain
+            if not isinstance(path.field, Column):
+                chain = (*chain, path.attribute)
+            for depth in range(1, len(chain) + 1):
+                chains.setdefault(chain[:depth])
+        if 'updated_at' not in field_index.table.columns or any(
+            'updated_at' not in link.property.mapper.local_table.columns
+            or link.property.secondary is not None
+            for chain in chains
+            for link in chain
+        ):
+            return None
+
+        statement, params, _, _ = cls.select(
+            model,
+            query,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            validate=True,
+        )
+        rows = statement.subquery()
+        *keys, updated_at = rows.columns
+        aggregates = [
+            select(
+                func.json_build_array(
+                    sa_count(),
+                    func.max(updated_at),
+                    func.md5(
+                        cast(
+                            func.json_agg(
+                                aggregate_order_by(
+                                    func.json_build_array(*keys), *keys
+                                )
+                            ),
+                            Text,
+                        )
+                    ),
+                )
+            )
+            .select_from(rows)
+            .scalar_subquery()
+        ]
+        # Related rows are aggregated only for the returned parents.
+        parents = tuple_(*field_index.table.primary_key.columns).in_(
+            select(*keys)
+        )
+        for chain in chains:
+            joins, entity = [], model
+            for link in chain:
+                target = aliased(link.property.mapper.class_)
+                joins.append(getattr(entity, link.key).of_type(target))
+                entity = target
+            aggregate = select(
+                func.json_build_array(sa_count(), func.max(entity.updated_at))
+            ).select_from(model)
+            for join in joins:
+                aggregate = aggregate.join(join)
+            aggregates.append(aggregate.where(parents).scalar_subquery())
+        return select(*aggregates), params
+
+    @classmethod
+    def tables(
+        cls: Type[Self],
+        model: Union[Type[BaseInterface], Table],
+        /,
+        query: str,
+    ) -> FrozenSet[Table]:
+        field_index = FieldIndex.of(model)
+        shape, _, projection = cls._split(query)
+        tables = {field_index.table}
+        names = [name for group in shape for name, _, _ in group]
+        for name in (*names, *projection):
+            path = field_index.resolve(name)
+            for link in (*path.chain, path.attribute):
+                relationship = getattr(link, 'property', None)
+                if isinstance(relationship, RelationshipProperty):
+                    tables.add(relationship.mapper.local_table)
+                    if isinstance(relationship.secondary, Table):
+                        tables.add(relationship.secondary)
+        return frozenset(tables)
 
     @classmethod
     def _process(
@@ -482,14 +2393,14 @@ class EndPointStatementBuilder(object):
         Dict[Key, Iterable[ColumnClause]], List[List[Tuple[Key, ColumnFilter]]]
     ]:
         registry, filters = {}, []
+        field_index = FieldIndex.of(model)
         for entity_group in unquote(query.replace('+', ' ')).split('|'):
             group_filters: List = []
             for entity in entity_group.split('&'):
                 (name, value), (op_key, op) = cls._process_query(entity)
-                *chain, field = cls._get_field(model, name)
-                field_property = getattr(field, 'property', field)
-                field = getattr(field_property, 'expression', field)
-                if (key := (tuple(chain), field)) not in registry:
+                path = field_index.resolve(name)
+                chain, field = path.chain, path.field
+                if (key := (chain, field)) not in registry:
                     registry[key] = []
                 if not isinstance(field, Column):
                     group_filters.append((key, (value, op or op_key)))
@@ -500,21 +2411,33 @@ class EndPointStatementBuilder(object):
                 elif name.endswith('.'):
                     registry[key].append(field.asc())
 
-                try:
-                    value = cls._get_column_value(field, value)
-                    group_filters.append((key, (value, op or op_key)))
-                except ValueError as e:
-                    column_type = cls._get_column_type(field)
-                    raise HTTPException(
-                        HTTP_400_BAD_REQUEST,
-                        f"Value of type '{type(value).__name__}' of "
-                        f"parameter '{name}' is invalid, should be valid "
-                        f"value of type '{column_type.__name__}'.",
-                    ) from e
+                value = cls._convert_value(path, name, value)
+                group_filters.append((key, (value, op or op_key)))
             if group_filters:
                 filters.append(group_filters)
         return registry, filters
 
+    @classmethod
+    def _split(
+        cls: Type[Self],
+        query: str,
+        /,
+    ) -> Tuple[Shape, Tuple[Optional[str], ...], Tuple[str, ...]]:
+        shape, values, projection = [], [], []
+        if query:
+            for entity_group in unquote(query.replace('+', ' ')).split('|'):
+                group = []
+                for entity in entity_group.split('&'):
+                    (name, value), (op_key, _) = cls._process_query(entity)
+                    if name == 'fields' and op_key == '=':
+                        projection.extend(_ for _ in value.split(',') if _)
+                        continue
+                    group.append((name, op_key, bool(value)))
+                    values.append(value)
+                if group:
+                    shape.append(tuple(group))
+        return tuple(shape), tuple(values), tuple(projection)
+
     @classmethod
     def _process_query(
         cls: Type[Self],
@@ -530,105 +2453,18 @@ class EndPointStatementBuilder(object):
         return (entity, None), (None, None)
 
     @staticmethod
-    def _get_column_type(column: Column) -> Optional[Type]:
-        if getattr(getattr(column.type, 'impl', None), 'python_type', ''):
-            return column.type.impl.python_type
-        elif getattr(column.type, 'python_type', None):
-            return column.type.python_type
-        return None
-
-    @classmethod
-    def _get_column_value(
-        cls: Type[Self],
-        column: Column,
-        value: str,
+    def _convert_value(
+        path: FieldPath,
+        name: str,
+        value: Optional[str],
         /,
     ) -> Optional[Any]:
-        if (column_type := cls._get_column_type(column)) is None:
-            raise HTTPException(
-                HTTP_500_INTERNAL_SERVER_ERROR,
-                f'Could not infer python type for {column.key}.',
-            )
-
-        if value is not None:
-            value = unquote(value.replace('+', ' '))
-        if not value and not issubclass(column_type, str):
-            if not column.nullable:
-                return None
-            value = None
-        elif issubclass(column_type, bool):
-            if value not in {'true', 'false', '1', '0'}:
-                raise ValueError
-            value = value in {'true', '1'}
-        elif issubclass(column_type, (int, float, Decimal)):
-            value = column_type(value)
-        elif issubclass(column_type, timedelta):
-            value = timedelta(seconds=float(value))
-        elif issubclass(column_type, date):
-            value = isoparse(value).date()
-        elif issubclass(column_type, time):
-            value = isoparse(value).time()
-        elif issubclass(column_type, datetime):
-            value = isoparse(value)
-        return value
-
-    @classmethod
-    def _get_field(
-        cls: Type[Self],
-        model: Union[Type[BaseInterface], Table],
-        field: str,
-        /,
-        chain: tuple[RelationshipProperty, ...] = (),
-    ) -> Tuple[
-        Tuple[RelationshipProperty, ...], Union[Column, InstrumentedAttribute]
-    ]:
-        if not isinstance(table := model, Table):
-            table = model.__table__
-        column_keys, relationship_keys = _get_keys(model)
-        field, *relationship_fields = field.split('.')
-        if is_relationship := field not in column_keys:
-            if relationship_keys is None:
-                raise HTTPException(
-                    HTTP_500_INTERNAL_SERVER_ERROR,
-                    f"Mapper for table '{table.name}' is not present.",
-                )
-            if field not in relationship_keys:
-                table_or_relationship = 'relationship' if chain else 'table'
-                raise HTTPException(
-                    HTTP_400_BAD_REQUEST,
-                    f"Field '{field}' is not present in the '%s' "
-                    f'{table_or_relationship}. '
-                    % '.'.join((table.name, *(_.key for _ in chain)))
-                    + 'Available fields: %s.'
-                    % ', '.join(
-                        f"'{_}'" for _ in (*column_keys, *relationship_keys)
-                    ),
-                )
-
-        if is_relationship and any(relationship_fields):
-            for relationship in relationship_keys.values():
-                if relationship.key == field:
-                    try:
-                        return cls._get_field(
-                            relationship.entity.class_,
-                            '.'.join(relationship_fields),
-                            (*chain, getattr(model, field)),
-                        )
-                    except AttributeError as _:
-                        raise HTTPException(
-                            HTTP_500_INTERNAL_SERVER_ERROR,
-                            'Could not infer type for relationship: '
-                            f'{relationship}',
-                        ) from _
-
+        try:
+            return path.convert(value)
+        except (ValueError, ArithmeticError) as e:
             raise HTTPException(
                 HTTP_400_BAD_REQUEST,
-                f"Relationship '{field}' is not present in %s."
-                % '.'.join((table.name, *(_.key for _ in chain))),
-            )
-        return *chain, getattr(
-            getattr(model, 'columns', model)
-            if isinstance(model, Table)
-            else model,
-            field,
-        )
+                f"Value of type '{type(value).__name__}' of "
+                f"parameter '{name}' is invalid, should be valid "
+                f"value of type '{path.python_type.__name__}'.",
+            ) from e
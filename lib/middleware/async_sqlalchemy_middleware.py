@@ -1,9 +1,12 @@
+from asyncio import Lock, TimeoutError, gather
 from dataclasses import dataclass
 from logging import Logger
+from time import monotonic
 from types import TracebackType
-from typing import TYPE_CHECKING, Any, Final, Optional, Type, Union
+from typing import TYPE_CHECKING, Any, Dict, Final, Optional, Type, Union
 
 from sqlalchemy.engine.base import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio.engine import AsyncConnection, AsyncEngine
 from sqlalchemy.ext.asyncio.scoping import async_scoped_session
 from sqlalchemy.ext.asyncio.session import AsyncSession
@@ -12,7 +15,7 @@ from sqlalchemy.orm.session import Session as SyncSession
 from sqlalchemy.orm.session import sessionmaker
 from sqlalchemy.sql.schema import MetaData
 from starlette.responses import Response
-from starlette.types import ASGIApp, Receive, Scope, Send
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from typing_extensions import Self
 
 from ..utils.anyfunction import anycorofunction
@@ -28,6 +31,11 @@ class AsyncSQLAlchemyMiddleware(object):
         Union[None, sessionmaker, scoped_session, async_scoped_session]
     ]
     metadata: Final[MetaData]
+    warm: Final[int]
+    retry_interval: Final[float]
+    max_retry_interval: Final[float]
+    _lock: Final[Lock]
+    _state: Final[Dict[str, Any]]
 
     if TYPE_CHECKING:
         from sqlalchemy.orm.decl_api import _DeclarativeBase
@@ -46,6 +54,9 @@ class AsyncSQLAlchemyMiddleware(object):
             AsyncEngine,
         ],
         metadata: Union[MetaData, Any],
+        warm: int = 0,
+        retry_interval: float = 1,
+        max_retry_interval: float = 30,
     ) -> None:
         if isinstance(metadata, MetaData):
             object.__setattr__(self, 'metadata', metadata)
@@ -77,25 +88,78 @@ class AsyncSQLAlchemyMiddleware(object):
         object.__setattr__(self, 'app', app)
         object.__setattr__(self, 'engine', bind)
         object.__setattr__(self, 'Session', Session)
+        object.__setattr__(self, 'warm', warm)
+        object.__setattr__(self, 'retry_interval', retry_interval)
+        object.__setattr__(self, 'max_retry_interval', max_retry_interval)
+        object.__setattr__(self, '_lock', Lock())
+        object.__setattr__(
+            self, '_state', dict(started=False, failures=0, retry_at=0.0)
+        )
 
     async def start(self: Self, /) -> Self:
-        if self.metadata.is_bound():
-            self.logger.debug('Metadata Tables creation skipped.')
+        if self._state['started']:
             return self
-
-        self.logger.info('Metadata Tables creation.')
-        if isinstance(self.engine, Engine):
-            with self.engine.begin() as connection:
-                self.metadata.create_all(connection)
-                self.metadata.bind = self.engine
+        # Concurrent requests wait for a single attempt to finish.
+        async with self._lock:
+            if self._state['started'] or monotonic() < self._state['retry_at']:
                 return self
+            return await self._start()
 
-        async with self.engine.begin() as connection:
-            await connection.run_sync(self.metadata.create_all)
-            self.metadata.bind = self.engine
+    async def _start(self: Self, /) -> Self:
+        try:
+            if self.metadata.is_bound():
+                self.logger.debug('Metadata Tables creation skipped.')
+            elif isinstance(self.engine, Engine):
+                self.logger.info('Metadata Tables creation.')
+                with self.engine.begin() as connection:
+                    self.metadata.create_all(connection)
+                    self.metadata.bind = self.engine
+            else:
+                self.logger.info('Metadata Tables creation.')
+                async with self.engine.begin() as connection:
+                    await connection.run_sync(self.metadata.create_all)
+                    self.metadata.bind = self.engine
+            await self._warm()
+        except (SQLAlchemyError, OSError, TimeoutError) as exception:
+            # The application still starts, a later request retries.
+            delay = min(
+                self.retry_interval * 2 ** self._state['failures'],
+                self.max_retry_interval,
+            )
+            self._state['failures'] += 1
+            self._state['retry_at'] = monotonic() + delay
+            self.logger.error(
+                'Database start failed, retrying in %ss: %s', delay, exception
+            )
             return self
+        self._state.update(started=True, failures=0, retry_at=0.0)
+        return self
+
+    async def _warm(self: Self, /) -> None:
+        if self.warm <= 0:
+            return
+        # Connections opened side by side are all kept by the pool.
+        self.logger.info('Engine pool warm-up with %s connections.', self.warm)
+        if isinstance(self.engine, Engine):
+            connections = [self.engine.connect() for _ in range(self.warm)]
+            for connection in connections:
+                connection.close()
+            return
+        # The first connection runs the one-time dialect initialization.
+        connections = [await self.engine.connect().start()]
+        results = await gather(
+            *(self.engine.connect().start() for _ in range(self.warm - 1)),
+            return_exceptions=True,
+        )
+        connections += (_ for _ in results if isinstance(_, AsyncConnection))
+        await gather(*(_.close() for _ in connections))
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
 
     async def stop(self: Self, /, *, dispose: bool = True) -> None:
+        if dispose:
+            self._state['started'] = False
         try:
             if (remove := getattr(self.Session, 'remove', None)) is not None:
                 self.logger.debug('Scoped Session removal.')
@@ -119,7 +183,7 @@ class AsyncSQLAlchemyMiddleware(object):
         exc_val: Optional[BaseException],
         exc_tb: Optional[TracebackType],
     ) -> None:
-        await self.stop(dispose=exc_val is not None)
+        await self.stop()
 
     async def __call__(
         self: Self,
@@ -128,9 +192,41 @@ class AsyncSQLAlchemyMiddleware(object):
         receive: Receive,
         send: Send,
     ) -> Response:
-        async with self:
-            scope['engine'] = self.engine
-            scope['Session'] = self.Session
-            scope['metadata'] = self.metadata
-            scope['Base'] = self.Base
+        if scope['type'] == 'lifespan':
+            return await self.app(
+                scope, self._receive(receive), self._send(send)
+            )
+
+        # The engine lives for the lifespan, requests only hold a session.
+        if not self._state['started']:
+            await self.start()
+        scope['engine'] = self.engine
+        scope['Session'] = self.Session
+        scope['metadata'] = self.metadata
+        scope['Base'] = self.Base
+        try:
             return await self.app(scope, receive, send)
+        finally:
+            await self.stop(dispose=False)
+
+    def _receive(self: Self, receive: Receive, /) -> Receive:
+        async def receive_lifespan() -> Message:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Raising here would skip the startup handlers altogether.
+                try:
+                    await self.start()
+                except Exception:
+                    self.logger.exception('Database start failed.')
+            return message
+
+        return receive_lifespan
+
+    def _send(self: Self, send: Send, /) -> Send:
+        async def send_lifespan(message: Message, /) -> None:
+            # The shutdown handlers of the application may still write.
+            if message['type'] == 'lifespan.shutdown.complete':
+                await self.stop()
+            return await send(message)
+
+        return send_lifespan
@@ -0,0 +1,266 @@
+from asyncio import get_running_loop
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from gzip import compress as gzip_compress
+from os import environ
+from typing import Any, Callable, Dict, Final, Optional, Tuple
+from zlib import DEFLATED, Z_SYNC_FLUSH, compressobj
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.status import (
+    HTTP_204_NO_CONTENT,
+    HTTP_206_PARTIAL_CONTENT,
+    HTTP_304_NOT_MODIFIED,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing_extensions import Self
+
+from ..utils.ttl_cache import TTLCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+#
+COMPRESSION_MINIMUM_SIZE: Final[int] = int(
+    environ.get('COMPRESSION_MINIMUM_SIZE', 1024)
+)
+COMPRESSION_OFFLOAD_SIZE: Final[int] = int(
+    environ.get('COMPRESSION_OFFLOAD_SIZE', 65536)
+)
+COMPRESSION_WORKERS: Final[int] = int(environ.get('COMPRESSION_WORKERS', 4))
+COMPRESSION_CACHE_SIZE: Final[int] = int(
+    environ.get('COMPRESSION_CACHE_SIZE', 256)
+)
+COMPRESSION_CACHE_TTL: Final[float] = float(
+    environ.get('COMPRESSION_CACHE_TTL', 300)
+)
+COMPRESSION_CACHE_MAX_BODY_SIZE: Final[int] = int(
+    environ.get('COMPRESSION_CACHE_MAX_BODY_SIZE', 1 << 20)
+)
+COMPRESSIBLE_MEDIA_TYPES: Final[Tuple[str, ...]] = (
+    'text/',
+    'application/json',
+    'application/x-ndjson',
+    'application/vnd.columnar+json',
+    'application/msgpack',
+    'application/vnd.apache.arrow.stream',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+# Levels favour speed, as every body is compressed on the fly.
+COMPRESSION_LEVELS: Final[Dict[str, int]] = dict(zstd=3, br=4, gzip=6)
+StreamCompressor = Callable[[bytes, bool], bytes]
+
+
+def get_encodings() -> Tuple[str, ...]:
+    """Return the supported encodings in the order of preference."""
+    return (
+        *(('zstd',) if zstandard is not None else ()),
+        *(('br',) if brotli is not None else ()),
+        'gzip',
+    )
+
+
+def negotiate(accept_encoding: str, /) -> Optional[str]:
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(','):
+        coding, *params = item.split(';')
+        weight = 1.0
+        for param in params:
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding := coding.strip():
+            weights[coding] = weight
+
+    weight, _, encoding = max(
+        (weights.get(_, weights.get('*', 0.0)), -index, _)
+        for index, _ in enumerate(get_encodings())
+    )
+    return encoding if weight > 0 else None
+
+
+def compress(encoding: str, body: bytes, level: int, /) -> bytes:
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    elif encoding == 'br':
+        return brotli.compress(body, quality=level)
+    return gzip_compress(body, level, mtime=0)
+
+
+def get_stream_compressor(encoding: str, level: int, /) -> StreamCompressor:
+    """Return the compressor flushing every chunk to keep streams live."""
+    if encoding == 'zstd':
+        zstd = zstandard.ZstdCompressor(level=level).compressobj()
+        return lambda data, final: zstd.compress(data) + (
+            zstd.flush()
+            if final
+            else zstd.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        )
+    elif encoding == 'br':
+        br = brotli.Compressor(quality=level)
+        return lambda data, final: br.process(data) + (
+            br.finish() if final else br.flush()
+        )
+    gzip = compressobj(level, DEFLATED, 31)
+    return lambda data, final: gzip.compress(data) + (
+        gzip.flush() if final else gzip.flush(Z_SYNC_FLUSH)
+    )
+
+
+@dataclass(init=False, frozen=True)
+class CompressionMiddleware(object):
+
+    app: Final[ASGIApp]
+    minimum_size: Final[int]
+    offload_size: Final[int]
+    executor: Final[ThreadPoolExecutor]
+    cache: Final[TTLCache[Tuple[str, str], bytes]]
+    cache_max_body_size: Final[int]
+
+    def __init__(
+        self: Self,
+        /,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        offload_size: int = COMPRESSION_OFFLOAD_SIZE,
+        workers: int = COMPRESSION_WORKERS,
+        cache_size: int = COMPRESSION_CACHE_SIZE,
+        cache_ttl: float = COMPRESSION_CACHE_TTL,
+        cache_max_body_size: int = COMPRESSION_CACHE_MAX_BODY_SIZE,
+    ) -> None:
+        object.__setattr__(self, 'app', app)
+        object.__setattr__(self, 'minimum_size', minimum_size)
+        object.__setattr__(self, 'offload_size', offload_size)
+        object.__setattr__(
+            self,
+            'executor',
+            ThreadPoolExecutor(workers, thread_name_prefix='compression'),
+        )
+        object.__setattr__(self, 'cache', TTLCache(cache_size, cache_ttl))
+        object.__setattr__(self, 'cache_max_body_size', cache_max_body_size)
+
+    async def __call__(
+        self: Self,
+        /,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        encoding = negotiate(Headers(scope=scope).get('accept-encoding', ''))
+        level = COMPRESSION_LEVELS.get(encoding, 0)
+        state: Dict[str, Any] = dict(start=None, compressor=None)
+
+        async def send_compressed(message: Message, /) -> None:
+            if message['type'] == 'http.response.start':
+                state['start'] = message
+                return
+            elif message['type'] != 'http.response.body':
+                return await send(message)
+
+            body: bytes = message.get('body', b'')
+            more_body: bool = message.get('more_body', False)
+            if (start := state['start']) is None:
+                if (compressor := state['compressor']) is not None:
+                    message['body'] = await self._run(
+                        body, compressor, body, not more_body
+                    )
+                return await send(message)
+
+            state['start'] = None
+            headers = MutableHeaders(raw=start['headers'])
+            if not self._is_compressible(start['status'], headers):
+                await send(start)
+                return await send(message)
+            headers.add_vary_header('Accept-Encoding')
+            if encoding is None or (
+                not more_body and len(body) < self.minimum_size
+            ):
+                await send(start)
+                return await send(message)
+
+            if more_body:
+                # Streams are compressed chunk by chunk as they are produced.
+                del headers['content-length']
+                state['compressor'] = compressor = get_stream_compressor(
+                    encoding, level
+                )
+                body = await self._run(body, compressor, body, False)
+            else:
+                body = await self._compress(encoding, level, body, headers)
+                headers['content-length'] = str(len(body))
+            headers['content-encoding'] = encoding
+            if (etag := headers.get('etag')) and not etag.startswith('W/'):
+                # The encoded body is no longer byte-equal to the original.
+                headers['etag'] = 'W/' + etag
+            await send(start)
+            await send(dict(message, body=body))
+
+        await self.app(scope, receive, send_compressed)
+
+    def _is_compressible(
+        self: Self,
+        status: int,
+        headers: MutableHeaders,
+        /,
+    ) -> bool:
+        return (
+            status
+            not in {
+                HTTP_204_NO_CONTENT,
+                HTTP_206_PARTIAL_CONTENT,
+                HTTP_304_NOT_MODIFIED,
+            }
+            and 'content-encoding' not in headers
+            and headers.get('content-type', '')
+            .lower()
+            .startswith(COMPRESSIBLE_MEDIA_TYPES)
+        )
+
+    async def _compress(
+        self: Self,
+        encoding: str,
+        level: int,
+        body: bytes,
+        headers: MutableHeaders,
+        /,
+    ) -> bytes:
+        # Only responses carrying a validator are stored precompressed.
+        key = None
+        if (etag := headers.get('etag')) and 'no-store' not in headers.get(
+            'cache-control', ''
+        ):
+            key = (etag, encoding)
+            if (compressed := self.cache.get(key)) is not None:
+                return compressed
+        compressed = await self._run(body, compress, encoding, body, level)
+        if key is not None and len(compressed) <= self.cache_max_body_size:
+            self.cache.set(key, compressed)
+        return compressed
+
+    async def _run(
+        self: Self,
+        body: bytes,
+        function: Callable[..., bytes],
+        /,
+        *args: Any,
+    ) -> bytes:
+        if len(body) < self.offload_size:
+            return function(*args)
+        # zlib, brotli and zstd release the GIL while compressing.
+        return await get_running_loop().run_in_executor(
+            self.executor, function, *args
+        )
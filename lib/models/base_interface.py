@@ -14,6 +14,9 @@ from typing import (
     Final,
     Iterable,
     List,
+    Optional,
+    Set,
+    Tuple,
     Type,
     Union,
 )
@@ -21,7 +24,6 @@ from uuid import UUID
 
 from inflect import engine
 from pydantic.main import BaseConfig, BaseModel, create_model
-from sqlalchemy.inspection import inspect
 from sqlalchemy.orm.decl_api import declarative_base, declared_attr
 from sqlalchemy.orm.properties import ColumnProperty
 from sqlalchemy.orm.relationships import RelationshipProperty
@@ -34,6 +36,10 @@ Serializable = Union[
     Union[None, bool, int, float, Decimal, str],
     Union[List['Serializable'], Dict[str, 'Serializable']],
 ]
+Serializer = Callable[[Any, Set[int]], Dict[str, Serializable]]
+Encoders = Tuple[Tuple[str, Optional[Callable[[Any], Any]]], ...]
+_serializers: Final[Dict[type, Serializer]] = {}
+_encoders: Final[Dict[type, Encoders]] = {}
 
 
 def serialize(
@@ -44,18 +50,7 @@ def serialize(
     encoding: str = 'utf8',
 ) -> Serializable:
     if isinstance(value, BaseInterface):
-        state: InstanceState = inspect(value)
-        serialized = {_.key: state.dict.get(_.key) for _ in value.columns}
-        for relationship in value.relationships:
-            _def = [] if relationship.uselist else None
-            if (_value := state.dict.get(relationship.key, _def)) in checked:
-                _value = None
-            elif isinstance(_value, list):
-                for checked_model in checked:
-                    while checked_model in _value:
-                        _value.remove(checked_model)
-            serialized[relationship.key] = _value
-        return serialize(serialized, (*checked, value))
+        return get_serializer(type(value))(value, {id(_) for _ in checked})
     elif isinstance(value, (type(None), bool, int, float, str)):
         return value
     elif isinstance(value, Decimal):
@@ -83,6 +78,142 @@ def serialize(
         raise TypeError(f'Unserializable type "{type(value)}": {value}')
 
 
+def get_serializer(cls: Type[BaseInterface], /) -> Serializer:
+    if (serializer := _serializers.get(cls)) is None:
+        serializer = _serializers[cls] = _compile_serializer(cls)
+    return serializer
+
+
+def get_encoders(cls: Type[BaseInterface], /) -> Encoders:
+    if (encoders := _encoders.get(cls)) is None:
+        encoders = _encoders[cls] = tuple(
+            (_.key, _get_encoder(_)) for _ in cls.columns
+        )
+    return encoders
+
+
+def _get_encoder(column: Column, /) -> Optional[Callable[[Any], Any]]:
+    python_type = None
+    with suppress(NotImplementedError):
+        python_type = column.type.python_type
+    # The types orjson encodes natively are passed through.
+    if python_type in {bool, int, float, str, datetime, date, dict, list}:
+        return None
+    elif python_type is Decimal:
+        return float
+    elif python_type is UUID:
+        return str
+    elif python_type is timedelta:
+        return timedelta.total_seconds
+    elif python_type is time:
+        return time.isoformat
+    return serialize
+
+
+def _compile_serializer(cls: Type[BaseInterface], /) -> Serializer:
+    columns = get_encoders(cls)
+    relationships: Tuple[Tuple[str, bool], ...] = tuple(
+        (_.key, _.uselist) for _ in cls.relationships
+    )
+
+    def serializer(
+        value: Any,
+        ancestors: Set[int],
+        /,
+    ) -> Dict[str, Serializable]:
+        # The instance dictionary is the state dictionary of the mapper.
+        loaded = value.__dict__
+        serialized: Dict[str, Serializable] = {}
+        for key, encoder in columns:
+            if key in loaded:
+                if (item := loaded[key]) is not None and encoder is not None:
+                    item = encoder(item)
+                serialized[key] = item
+
+        ancestors.add(id(value))
+        try:
+            for key, uselist in relationships:
+                item = loaded.get(key)
+                if uselist:
+                    serialized[key] = [
+                        get_serializer(type(_))(_, ancestors)
+                        for _ in item or ()
+                        if id(_) not in ancestors
+                    ]
+                elif item is None or id(item) in ancestors:
+                    serialized[key] = None
+                else:
+                    serialized[key] = get_serializer(type(item))(
+                        item, ancestors
+                    )
+        finally:
+            ancestors.discard(id(value))
+        return serialized
+
+    return serializer
+
+
+def serialize_columnar(values: Iterable[Any], /) -> Dict[str, Serializable]:
+    layout: Dict[str, Any] = {}
+    rows = [_serialize_row(_, layout, set()) for _ in values]
+    return dict(columns=_get_columns(layout), rows=rows)
+
+
+def _serialize_row(
+    value: Any,
+    layout: Dict[str, Any],
+    ancestors: Set[int],
+    /,
+) -> List[Serializable]:
+    loaded = value.__dict__
+    if not layout:
+        # The first instance at a path fixes the layout of all the others.
+        layout['columns'] = tuple(
+            _ for _ in get_encoders(type(value)) if _[0] in loaded
+        )
+        layout['relationships'] = tuple(
+            (_.key, _.uselist, {})
+            for _ in type(value).relationships
+            if _.key in loaded
+        )
+
+    row: List[Serializable] = []
+    for key, encoder in layout['columns']:
+        if (item := loaded.get(key)) is not None and encoder is not None:
+            item = encoder(item)
+        row.append(item)
+
+    ancestors.add(id(value))
+    try:
+        for key, uselist, nested in layout['relationships']:
+            item = loaded.get(key)
+            if uselist:
+                row.append(
+                    [
+                        _serialize_row(_, nested, ancestors)
+                        for _ in item or ()
+                        if id(_) not in ancestors
+                    ]
+                )
+            elif item is None or id(item) in ancestors:
+                row.append(None)
+            else:
+                row.append(_serialize_row(item, nested, ancestors))
+    finally:
+        ancestors.discard(id(value))
+    return row
+
+
+def _get_columns(layout: Dict[str, Any], /) -> List[Serializable]:
+    return [
+        *(key for key, _ in layout.get('columns', ())),
+        *(
+            dict(name=key, columns=_get_columns(nested))
+            for key, _, nested in layout.get('relationships', ())
+        ),
+    ]
+
+
 class _OrmConfig(BaseConfig):
     orm_mode: Final[bool] = True
 
@@ -7,6 +7,7 @@ from .anyfunction import (
     isanycorofunction,
     isanyfunction,
 )
+from .ttl_cache import TTLCache
 
 __all__: tuple[str, ...] = (
     'AnyFunction',
@@ -14,4 +15,5 @@ __all__: tuple[str, ...] = (
     'anyfunction',
     'isanycorofunction',
     'isanyfunction',
+    'TTLCache',
 )
@@ -0,0 +1,101 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
+from typing import (
+    Any,
+    Dict,
+    Final,
+    FrozenSet,
+    Generic,
+    Hashable,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from typing_extensions import Self
+
+#
+_K = TypeVar('_K', bound=Hashable)
+_V = TypeVar('_V')
+
+
+@dataclass(init=False, frozen=True)
+class TTLCache(Generic[_K, _V]):
+    """The LRU cache with expiring entries that can be invalidated by tags."""
+
+    maxsize: Final[int]
+    ttl: Final[float]
+    _entries: Final['OrderedDict[_K, Tuple[float, _V, FrozenSet[Hashable]]]']
+    _tags: Final[Dict[Hashable, Set[_K]]]
+    _stats: Final[Dict[str, int]]
+
+    def __init__(self: Self, maxsize: int, ttl: float, /) -> None:
+        object.__setattr__(self, 'maxsize', maxsize)
+        object.__setattr__(self, 'ttl', ttl)
+        object.__setattr__(self, '_entries', OrderedDict())
+        object.__setattr__(self, '_tags', {})
+        object.__setattr__(
+            self,
+            '_stats',
+            dict(hits=0, misses=0, invalidations=0, evictions=0),
+        )
+
+    def get(self: Self, key: _K, /) -> Optional[_V]:
+        if (entry := self._entries.get(key)) is None:
+            self._stats['misses'] += 1
+            return None
+        elif entry[0] < monotonic():
+            self._discard(key)
+            self._stats['misses'] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats['hits'] += 1
+        return entry[1]
+
+    def set(
+        self: Self,
+        key: _K,
+        value: _V,
+        /,
+        tags: Iterable[Hashable] = (),
+    ) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        self._discard(key)
+        tags = frozenset(tags)
+        self._entries[key] = (monotonic() + self.ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._discard(next(iter(self._entries)))
+            self._stats['evictions'] += 1
+
+    def invalidate(self: Self, *tags: Hashable) -> None:
+        for tag in tags:
+            for key in self._tags.pop(tag, ()):
+                self._discard(key)
+                self._stats['invalidations'] += 1
+
+    def clear(self: Self, /) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def info(self: Self, /) -> Dict[str, Any]:
+        return dict(
+            self._stats,
+            size=len(self._entries),
+            maxsize=self.maxsize,
+            ttl=self.ttl,
+        )
+
+    def _discard(self: Self, key: _K, /) -> None:
+        if (entry := self._entries.pop(key, None)) is None:
+            return
+        for tag in entry[2]:
+            if (keys := self._tags.get(tag)) is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
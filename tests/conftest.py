@@ -0,0 +1,24 @@
+from os import environ
+from socket import create_connection
+from typing import Iterator
+from urllib.parse import urlsplit
+
+from pytest import fixture, skip
+from starlette.testclient import TestClient
+
+#
+environ.setdefault('DATABASE_URL', 'postgres:postgres@localhost:5432/postgres')
+
+
+@fixture(scope='session')
+def client() -> Iterator[TestClient]:
+    url = urlsplit('//' + environ['DATABASE_URL'].split('://')[-1])
+    try:
+        create_connection((url.hostname, url.port or 5432), 1).close()
+    except OSError:
+        skip('Database is not available.')
+
+    from lib.main import app
+
+    with TestClient(app, base_url='https://testserver') as client:
+        yield client
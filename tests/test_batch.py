@@ -0,0 +1,28 @@
+from pytest import MonkeyPatch
+from starlette.responses import Response
+from starlette.testclient import TestClient
+
+from lib.methods import batch
+from lib.methods.endpoint import EndPoint
+
+
+class _BrokenEndPoint(EndPoint):
+    async def __call__(self) -> Response:
+        if self.request.path_params['route'] == 'broken':
+            raise RuntimeError
+        return await super().__call__()
+
+
+def test_failing_entry_keeps_the_others(
+    client: TestClient, monkeypatch: MonkeyPatch
+) -> None:
+    monkeypatch.setattr(batch, 'EndPoint', _BrokenEndPoint)
+    response = client.post(
+        '/settings/batch',
+        json=dict(ok='/images/1', missing='/missing', broken='/broken'),
+    )
+    assert response.status_code == 200
+    entries = response.json()
+    assert entries['ok']['status'] == 200
+    assert entries['missing']['status'] == 400
+    assert entries['broken']['status'] == 500
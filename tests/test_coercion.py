@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+from uuid import UUID
+
+from pytest import raises
+from starlette.exceptions import HTTPException
+from starlette.testclient import TestClient
+
+from lib.methods.endpoint import EndPoint
+
+#
+ID = 'c2af2524-40cc-47e5-84ba-1ef110a120e3'
+
+
+def test_body_item_is_coerced_by_column_types(client: TestClient) -> None:
+    item = EndPoint._coerce_item(
+        None,
+        EndPoint._routes['users'],
+        dict(id=ID, last_sign_in_at='2022-01-01T10:00:00+00:00', extra=1),
+    )
+    assert item['id'] == UUID(ID)
+    assert item['last_sign_in_at'] == datetime(
+        2022, 1, 1, 10, tzinfo=timezone.utc
+    )
+    assert item['extra'] == 1
+
+
+def test_invalid_or_missing_values_are_rejected(client: TestClient) -> None:
+    drops = EndPoint._routes['container_tank_person_opening_drops']
+    with raises(HTTPException) as info:
+        EndPoint._coerce_item(None, drops, dict(opening_id=1))
+    assert info.value.status_code == 400
+    users = EndPoint._routes['users']
+    with raises(HTTPException) as info:
+        EndPoint._coerce_item(None, users, dict(id=ID, last_sign_in_at='-'))
+    assert info.value.detail == "Value of field 'last_sign_in_at' is invalid."
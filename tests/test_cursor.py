@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from pytest import raises
+from starlette.exceptions import HTTPException
+from starlette.testclient import TestClient
+
+from lib.main import Base
+from lib.methods._field_index import FieldIndex
+from lib.methods.endpoint import EndPointStatementBuilder
+
+
+def test_cursor_round_trip(client: TestClient) -> None:
+    paths = FieldIndex.of(Base.metadata.tables['images']).paths
+    keys = ((paths['created_at'], True), (paths['id'], False))
+    item = SimpleNamespace(created_at=datetime.now(timezone.utc), id=5)
+    token = EndPointStatementBuilder.encode_cursor(keys, item)
+    assert EndPointStatementBuilder.decode_cursor(keys, token) == [
+        item.created_at,
+        item.id,
+    ]
+    with raises(HTTPException):
+        EndPointStatementBuilder.decode_cursor(keys[1:], token)
+
+
+def test_cursor_pages_follow_each_other(client: TestClient) -> None:
+    client.post('/images', json=[{'url': '-'}] * 3)
+    first = client.get('/images/2/cursor?id.')
+    link = first.headers['link'].split(';')[0].strip('<>')
+    assert '/images/2/cursor/' in link
+    second = client.get(link)
+    assert second.status_code == 200
+    assert first.json()[-1]['id'] < second.json()[0]['id']
+
+
+def test_offset_is_not_read_as_cursor(client: TestClient) -> None:
+    for path in ('/images/2/token', '/images/2/cursor/token'):
+        response = client.get(path)
+        assert response.status_code == 400
+    assert client.get('/images/2/token').json()['detail'] == (
+        'Offset is invalid.'
+    )
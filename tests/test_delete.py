@@ -0,0 +1,23 @@
+from pytest import MonkeyPatch, mark
+from starlette.testclient import TestClient
+
+from lib.methods import endpoint
+
+
+@mark.parametrize('method', ['DELETE', 'PATCH'])
+@mark.parametrize('query', ['', 'id', 'id.'])
+def test_unfiltered_write_is_guarded(
+    client: TestClient, monkeypatch: MonkeyPatch, method: str, query: str
+) -> None:
+    monkeypatch.setattr(endpoint, 'DELETE_GUARD_THRESHOLD', 1)
+    client.post('/images', json=[{'url': '-'}, {'url': '-'}])
+    response = client.request(method, f'/images?{query}', json={'url': '-'})
+    assert response.status_code == 400
+    assert 'Prefer: force' in response.json()['detail']
+
+
+def test_filtered_delete_is_not_guarded(
+    client: TestClient, monkeypatch: MonkeyPatch
+) -> None:
+    monkeypatch.setattr(endpoint, 'DELETE_GUARD_THRESHOLD', 1)
+    assert client.delete('/images?id=-1').status_code == 204
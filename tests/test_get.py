@@ -0,0 +1,26 @@
+from starlette.testclient import TestClient
+
+from lib.methods.endpoint import ETAG_CACHE, RESPONSE_CACHE
+
+
+def test_conditional_get_revalidates_a_page(client: TestClient) -> None:
+    RESPONSE_CACHE.local.clear()
+    size = ETAG_CACHE.info()['size']
+    etag = client.get('/images/2').headers['etag']
+    assert ETAG_CACHE.info()['size'] == size
+
+    for _ in range(2):
+        RESPONSE_CACHE.local.clear()
+        hits = ETAG_CACHE.info()['hits']
+        response = client.get('/images/2', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['etag'] == etag
+    assert ETAG_CACHE.info()['hits'] == hits + 1
+
+
+def test_stream_has_no_etag(client: TestClient) -> None:
+    response = client.get(
+        '/images/2', headers={'Accept': 'application/x-ndjson'}
+    )
+    assert response.status_code == 200
+    assert 'etag' not in response.headers
@@ -0,0 +1,33 @@
+from uuid import uuid4
+
+from pytest import mark
+from starlette.testclient import TestClient
+
+from lib.main import sqlalchemy
+
+#
+KEYS = {'Prefer': 'return=keys'}
+
+
+@mark.parametrize('csv', [False, True])
+def test_invalid_line_after_copied_chunk_leaves_no_rows(
+    client: TestClient, csv: bool
+) -> None:
+    [image] = client.post('/images', json={'url': '-'}, headers=KEYS).json()
+    urls = [str(uuid4()) for _ in range(1000)]
+    if csv:
+        lines = ['url', *urls, '-,-']
+        content_type = 'text/csv'
+    else:
+        lines = [f'{{"url": "{_}"}}' for _ in urls] + ['-']
+        content_type = 'application/x-ndjson'
+    # A fresh connection skips the pre-ping, so COPY is its first statement.
+    client.portal.call(sqlalchemy.session_factory.kw['bind'].dispose)
+    response = client.post(
+        '/images',
+        data='\n'.join(lines),
+        headers={'Content-Type': content_type, 'Prefer': 'chunk-size=1000'},
+    )
+    assert response.status_code == 400
+    assert response.json()['detail'] == f'Line {len(lines)} is invalid.'
+    assert client.get(f'/images?id>{image["id"]}').json() == []
@@ -0,0 +1,50 @@
+from uuid import uuid4
+
+from starlette.testclient import TestClient
+
+from lib.main import sqlalchemy
+
+#
+KEYS = {'Prefer': 'return=keys'}
+
+
+def test_failing_copy_batch_leaves_no_rows(client: TestClient) -> None:
+    [image] = client.post('/images', json={'url': '-'}, headers=KEYS).json()
+    rows = [{'url': str(uuid4())} for _ in range(1000)]
+    # A fresh connection skips the pre-ping, so COPY is its first statement.
+    client.portal.call(sqlalchemy.session_factory.kw['bind'].dispose)
+    response = client.post('/images', json=[*rows, {**image, 'url': '-'}])
+    assert response.status_code >= 400
+    assert client.get(f'/images?id>{image["id"]}').json() == []
+
+
+def test_returned_keys_match_uuid_strings(client: TestClient) -> None:
+    ids = [str(uuid4()).upper() for _ in range(3)]
+    response = client.post(
+        '/audit_log_entries', json=[{'id': _} for _ in ids], headers=KEYS
+    )
+    assert response.status_code == 201
+    assert response.json() == [{'id': _.lower()} for _ in ids]
+
+
+def test_invalid_uuid_is_rejected(client: TestClient) -> None:
+    response = client.post('/audit_log_entries', json=[{'id': '-'}] * 2)
+    assert response.status_code == 400
+
+
+def test_upsert_updates_rows_on_conflicting_keys(client: TestClient) -> None:
+    [image] = client.post('/images', json={'url': '-'}, headers=KEYS).json()
+    response = client.put(
+        '/images',
+        json=[{**image, 'url': 'updated'}, {'url': 'inserted'}],
+        headers=KEYS,
+    )
+    assert response.status_code == 201
+    [updated, inserted] = response.json()
+    assert updated == image
+    assert inserted['id'] > image['id']
+    images = client.get(f'/images?id>={image["id"]}').json()
+    assert sorted((_['id'], _['url']) for _ in images) == [
+        (image['id'], 'updated'),
+        (inserted['id'], 'inserted'),
+    ]
@@ -0,0 +1,38 @@
+from asyncio import gather, run
+from typing import List
+
+from pytest import MonkeyPatch
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.sql.schema import MetaData
+
+from lib.middleware.async_sqlalchemy_middleware import (
+    AsyncSQLAlchemyMiddleware,
+)
+
+
+def test_failed_start_is_attempted_once_and_backs_off(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    attempts: List[None] = []
+    start = AsyncSQLAlchemyMiddleware._start
+
+    async def _start(self: AsyncSQLAlchemyMiddleware) -> None:
+        attempts.append(None)
+        return await start(self)
+
+    monkeypatch.setattr(AsyncSQLAlchemyMiddleware, '_start', _start)
+    middleware = AsyncSQLAlchemyMiddleware(
+        app=None,
+        bind=create_async_engine('postgresql+asyncpg://_:_@127.0.0.1:1/_'),
+        metadata=MetaData(),
+        retry_interval=60,
+    )
+
+    async def main() -> None:
+        await gather(*(middleware.start() for _ in range(8)))
+        await middleware.start()
+
+    run(main())
+    assert len(attempts) == 1
+    assert middleware._state['started'] is False
+    assert middleware._state['failures'] == 1
@@ -0,0 +1,26 @@
+from starlette.testclient import TestClient
+
+#
+ROUTE = '/nomenclature_categories'
+KEYS = {'Prefer': 'return=keys'}
+RENDER = {'Prefer': 'render=database'}
+
+
+def test_database_rendering_follows_self_referential_joins(
+    client: TestClient,
+) -> None:
+    parent = client.post(ROUTE, json={'fallback_name': '-'}, headers=KEYS)
+    parent_id = parent.json()[0]['id']
+    children = client.post(
+        ROUTE,
+        json=[{'fallback_name': '-', 'parent_id': parent_id}] * 2,
+        headers=KEYS,
+    )
+    ids = sorted(_['id'] for _ in children.json())
+    for id in (parent_id, ids[0]):
+        path = f'{ROUTE}?id={id}&parent&children&locales'
+        expected = client.get(path).json()
+        assert client.get(path, headers=RENDER).json() == expected
+
+    response = client.get(f'{ROUTE}?id={parent_id}&children', headers=RENDER)
+    assert sorted(_['id'] for _ in response.json()[0]['children']) == ids
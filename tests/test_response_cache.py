@@ -0,0 +1,32 @@
+from asyncio import run
+
+from sqlalchemy.sql.schema import Column, MetaData, Table
+from sqlalchemy.sql.sqltypes import Integer
+from starlette.responses import Response
+from starlette.testclient import TestClient
+
+from lib.methods._response_cache import ResponseCache
+
+
+def test_response_rendered_across_invalidation_is_not_served() -> None:
+    cache = ResponseCache(8, 60, 1 << 10)
+    tables = [Table('table', MetaData(), Column('id', Integer))]
+
+    async def main() -> None:
+        key, _ = await cache.get('key', tables)
+        await cache.invalidate(tables)
+        await cache.set(key, tables, Response(b'stale'))
+        assert (await cache.get('key', tables))[1] is None
+
+        key, _ = await cache.get('key', tables)
+        await cache.set(key, tables, Response(b'fresh'))
+        assert (await cache.get('key', tables))[1].body == b'fresh'
+
+    run(main())
+
+
+def test_write_invalidates_cached_responses(client: TestClient) -> None:
+    client.get('/images/1')
+    assert client.get('/images/1').headers['x-cache'] == 'hit'
+    client.post('/images', json={'url': '-'})
+    assert client.get('/images/1').headers['x-cache'] == 'miss'
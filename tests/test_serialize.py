@@ -0,0 +1,34 @@
+from decimal import Decimal
+from uuid import uuid4
+
+from orjson import loads
+
+from lib.main import _DefaultORJSONResponse
+from lib.models.base_interface import serialize
+from lib.models.nomenclatures.categories import (
+    nomenclature_category_model as categories,
+)
+
+#
+Category = categories.NomenclatureCategoryModel
+
+
+def test_cycles_are_cut_at_ancestors() -> None:
+    parent = Category(id=1, fallback_name='parent')
+    child = Category(id=2, fallback_name='child', parent=parent)
+    assert parent.children == [child]
+
+    serialized = serialize(parent)
+    assert serialized['parent'] is None
+    [item] = serialized['children']
+    assert item['id'] == 2
+    assert item['parent'] is None
+    assert serialize(child)['parent']['children'] == []
+
+
+def test_values_are_encoded_by_type() -> None:
+    value = uuid4()
+    body = _DefaultORJSONResponse.render(
+        None, {'decimal': Decimal('0.5'), 'uuid': value, 'items': {1, 2}}
+    )
+    assert loads(body) == {'decimal': 0.5, 'uuid': str(value), 'items': [1, 2]}
@@ -0,0 +1,50 @@
+from asyncio import run
+from logging import Logger
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from orjson import dumps
+from pytest import MonkeyPatch
+from sqlalchemy.sql.schema import Table
+from starlette.testclient import TestClient
+
+from lib.main import Base
+from lib.methods import _spool
+from lib.methods._spool import Spool
+
+
+def test_replay_resumes_after_the_last_written_table(
+    client: TestClient, monkeypatch: MonkeyPatch, tmp_path: Path
+) -> None:
+    written: List[Tuple[str, int]] = []
+    failed: List[str] = []
+
+    async def insert_rows(
+        engine: Any, table: Table, rows: List[Dict[str, Any]], /, _: Logger
+    ) -> int:
+        if table.name == 'locales' and not failed:
+            failed.append(table.name)
+            raise OSError
+        written.append((table.name, len(rows)))
+        return len(rows)
+
+    monkeypatch.setattr(_spool, 'insert_rows', insert_rows)
+    spool = Spool(tmp_path / 'spool.ndjson', 100, 0)
+    for name, rows in (
+        ('images', [{'url': '-'}, {'url': '-'}]),
+        ('locales', [{'name': '-'}]),
+        ('images', [{'url': '-'}]),
+    ):
+        spool._write(dumps(dict(table=name, rows=rows)) + b'\n')
+
+    async def main() -> None:
+        tables = Base.metadata.tables
+        await spool.start(None, {_: tables[_] for _ in ('images', 'locales')})
+        assert spool.info()['depth'] == 4
+        await spool._state['task']
+
+    run(main())
+    assert failed == ['locales']
+    assert written == [('images', 2), ('locales', 1), ('images', 1)]
+    assert spool.info()['depth'] == 0
+    assert not list(tmp_path.iterdir())